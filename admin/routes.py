@@ -1,7 +1,12 @@
 from flask import Blueprint,render_template, redirect, url_for, flash, request, session,send_from_directory, current_app,send_file
 from models import Job,Application,Student,Category
 from extensions import db
+from pagination import paginate
+from counters import get_counts
+from resume_storage import send_resume
+from resume_search import search_students
 from flask_login import login_required, current_user
+from sqlalchemy.orm import joinedload, undefer
 import os
 
 admin_bp = Blueprint('admin', __name__,url_prefix='/admin')
@@ -19,15 +24,13 @@ def admin_required(f):
 @login_required
 @admin_required
 def dashboard():
-    total_students = Student.query.count()
-    total_jobs = Job.query.count()
-    total_applications = Application.query.count()
+    counts = get_counts()
 
     return render_template(
         'admin/dashboard.html',
-        total_students=total_students,
-        total_jobs=total_jobs,
-        total_applications=total_applications,
+        total_students=counts['students'],
+        total_jobs=counts['jobs'],
+        total_applications=counts['applications'],
         
     )
 
@@ -56,18 +59,54 @@ def create_job():
             min_salary=form.min_salary.data 
         )
         db.session.add(new_job)
+        db.session.flush()
+        from job_similarity import index_job
+        index_job(new_job)
         db.session.commit()
+        from recommendations import queue_refresh
+        queue_refresh()
         flash('Job posted successfully!', 'success')
         return redirect(url_for('admin.jobs'))
     return render_template('admin/create_job.html', form=form)
 
 
+@admin_bp.route('/jobs/import', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def import_jobs():
+    from job_import import read_rows, import_jobs as run_import
+
+    result = None
+    if request.method == 'POST':
+        file = request.files.get('file')
+        if not file or not file.filename:
+            flash('Please choose a file to import.', 'danger')
+            return redirect(url_for('admin.import_jobs'))
+        try:
+            rows = read_rows(file)
+        except (ValueError, UnicodeDecodeError) as exc:
+            flash(f'Could not read the file: {exc}', 'danger')
+            return redirect(url_for('admin.import_jobs'))
+
+        dry_run = bool(request.form.get('dry_run'))
+        result = run_import(rows, dry_run=dry_run)
+        if dry_run:
+            flash(f'Checked {result.total} rows: {result.total - len(result.errors)} valid, {len(result.errors)} with errors.', 'info')
+        else:
+            flash(f'Imported {result.inserted} of {result.total} jobs.', 'success' if result.ok else 'warning')
+            if result.inserted:
+                from recommendations import queue_refresh
+                queue_refresh()
+
+    return render_template('admin/import_jobs.html', result=result)
+
+
 @admin_bp.route('/jobs')
 @login_required
 @admin_required
 def jobs():
-    jobs = Job.query.order_by(Job.posted_on.desc()).all()
-    return render_template('admin/job_list.html', jobs=jobs)
+    page = paginate(Job.query, (Job.posted_on, Job.id))
+    return render_template('admin/job_list.html', jobs=page.items, page=page)
 
 @admin_bp.route('/jobs/edit/<int:job_id>', methods=['GET', 'POST'])
 @login_required
@@ -75,7 +114,7 @@ def jobs():
 def edit_job(job_id):
     from admin.forms import JobForm
     from models import Category
-    job = Job.query.get_or_404(job_id)
+    job = Job.query.options(undefer(Job.description)).get_or_404(job_id)
     form = JobForm(obj=job)
     form.category_id.choices = [(c.id, c.name) for c in Category.query.all()]
 
@@ -86,6 +125,8 @@ def edit_job(job_id):
         job.category_id = form.category_id.data
         job.tags = form.tags.data
         job.description = form.description.data
+        from job_similarity import index_job
+        index_job(job)
         db.session.commit()
         flash("Job updated successfully!", "info")
         return redirect(url_for('admin.jobs'))
@@ -97,6 +138,8 @@ def edit_job(job_id):
 @admin_required
 def delete_job(job_id):
     job = Job.query.get_or_404(job_id)
+    from job_similarity import remove_jobs
+    remove_jobs([job.id])
     db.session.delete(job)
     db.session.commit()
     flash("Job deleted!", "danger")
@@ -108,54 +151,47 @@ def delete_job(job_id):
 @admin_required
 def view_applicants(job_id):
     job = Job.query.get_or_404(job_id)
-    applicants = job.applications  # list of Application objects
-    return render_template('admin/view_applicants.html', job=job, applicants=applicants)
+    # Load each applicant's student and user rows in the same query
+    applicants = (
+        Application.query
+        .filter_by(job_id=job.id)
+        .options(joinedload(Application.student).joinedload(Student.user))
+        .order_by(Application.id)
+        .all()
+    )
+    from applications import APPLICATION_STATUSES
+    from matching import rank_applications
+    top_matches, match_scores = rank_applications(job.id, applicants, k=current_app.config['MATCH_TOP_K'])
+    return render_template('admin/view_applicants.html', job=job, applicants=applicants,
+                           statuses=APPLICATION_STATUSES, top_matches=top_matches,
+                           match_scores=match_scores)
 
 @admin_bp.route('/applicants/download/<int:job_id>')
 @login_required
 @admin_required
 def download_applicants(job_id):
-    from openpyxl import Workbook
-    from flask import send_file
-    import os
-    from io import BytesIO
+    from exports import applicant_rows, csv_response, xlsx_response, APPLICANT_HEADERS
 
     job = Job.query.get_or_404(job_id)
-    applications = job.applications
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Applicants"
-    ws.append(["Student Name", "Email", "Resume", "Status", "Applied On"])
-
-    for app in applications:
-        student = app.student
-        user = student.user
-        ws.append([
-            student.name,
-            user.email,
-            student.resume,
-            app.status,
-            app.applied_on.strftime("%Y-%m-%d %H:%M")
-        ])
-
-    # Save to memory (not to disk)
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-
-    return send_file(
-        output,
-        download_name=f"applicants_job_{job_id}.xlsx",
-        as_attachment=True
-    )
+    rows = applicant_rows(job_id=job.id)
+
+    # ?format=csv streams rows as they are read; the default stays Excel
+    if request.args.get('format') == 'csv':
+        return csv_response(f"applicants_job_{job_id}.csv", APPLICANT_HEADERS, rows)
+    return xlsx_response(f"applicants_job_{job_id}.xlsx", "Applicants", APPLICANT_HEADERS, rows)
 
 @admin_bp.route('/applications')
 @login_required
 @admin_required
 def all_applications():
-    applications = Application.query.order_by(Application.applied_on.desc()).all()
-    return render_template('admin/all_applications.html', applications=applications)
+    applications = Application.query.options(
+        joinedload(Application.job),
+        joinedload(Application.student)
+    )
+    page = paginate(applications, (Application.applied_on, Application.id))
+    from applications import APPLICATION_STATUSES
+    return render_template('admin/all_applications.html', applications=page.items, page=page,
+                           statuses=APPLICATION_STATUSES)
 
 @admin_bp.route('/applications/update/<int:application_id>', methods=['POST'])
 @login_required
@@ -169,14 +205,81 @@ def update_application_status(application_id):
         flash("Application status updated.", "success")
     return redirect(request.referrer or url_for('admin.all_applications'))
 
+def _is_int(value):
+    # JSON true/false arrive as bool, which is an int subclass
+    return isinstance(value, int) and not isinstance(value, bool)
+
+@admin_bp.route('/applications/bulk-update', methods=['POST'])
+@login_required
+@admin_required
+def bulk_update_application_status():
+    """Update many applications in one statement.
+
+    Accepts form posts from the applicant tables, or JSON such as
+    {"status": "Rejected", "job_id": 3, "from_status": "pending"} or
+    {"status": "Selected", "application_ids": [1, 2, 3]}.
+    """
+    from applications import bulk_update_status
+    from flask import jsonify
+
+    if request.is_json:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Expected a JSON object."}), 400
+        ids = data.get('application_ids')
+        job_id = data.get('job_id')
+        from_status = data.get('from_status')
+        if ids is not None and not (isinstance(ids, list) and all(_is_int(i) for i in ids)):
+            return jsonify({"error": "application_ids must be a list of integers."}), 400
+        if job_id is not None and not _is_int(job_id):
+            return jsonify({"error": "job_id must be an integer."}), 400
+        if from_status is not None and not isinstance(from_status, str):
+            return jsonify({"error": "from_status must be a string."}), 400
+        params = dict(
+            status=data.get('status'),
+            application_ids=ids,
+            job_id=job_id,
+            from_status=from_status
+        )
+    else:
+        ids = request.form.getlist('application_ids', type=int)
+        if not ids and not request.form.get('from_status'):
+            flash("Select at least one application.", "warning")
+            return redirect(request.referrer or url_for('admin.all_applications'))
+        params = dict(
+            status=request.form.get('status'),
+            application_ids=ids or None,
+            job_id=request.form.get('job_id', type=int),
+            from_status=request.form.get('from_status') or None
+        )
+
+    try:
+        updated = bulk_update_status(**params)
+    except ValueError as exc:
+        if request.is_json:
+            return jsonify({"error": str(exc)}), 400
+        flash(str(exc), "danger")
+        return redirect(request.referrer or url_for('admin.all_applications'))
+
+    if request.is_json:
+        return jsonify({"updated": updated})
+    flash(f"{updated} application(s) updated.", "success")
+    return redirect(request.referrer or url_for('admin.all_applications'))
+
 
 
 @admin_bp.route('/students/<int:student_id>')
 @login_required
 @admin_required
 def view_student(student_id):
-    student = Student.query.get_or_404(student_id)
-    applications = student.applied_jobs
+    student = Student.query.options(joinedload(Student.user)).get_or_404(student_id)
+    applications = (
+        Application.query
+        .filter_by(student_id=student.id)
+        .options(joinedload(Application.job))
+        .order_by(Application.applied_on.desc())
+        .all()
+    )
     return render_template('admin/student_details.html', student=student, applications=applications)
 
 @admin_bp.route('/search')
@@ -185,7 +288,7 @@ def view_student(student_id):
 def search():
     query = request.args.get('q', '')
     jobs = Job.query.filter(Job.title.ilike(f"%{query}%")).all()
-    students = Student.query.filter(Student.name.ilike(f"%{query}%")).all()
+    students = search_students(query) if query.strip() else []
     return render_template('admin/search_results.html', jobs=jobs, students=students, query=query)
 
 #----------CATEGORIES MANAGEMENT---------
@@ -244,87 +347,166 @@ def delete_category(id):
 @login_required
 @admin_required
 def analytics():
-    job_count = Job.query.count()
-    application_count = Application.query.count()
-    student_count = Student.query.count()
-    
-    # Fetch all categories to display individual charts
-    categories = Category.query.all()
-    
-    # You can add chart data here
-    return render_template('admin/analytics.html', job_count=job_count,
-                            application_count=application_count,
-                            student_count=student_count,
-                            categories=categories)
+    counts = get_counts()
+
+    # Chart series are fetched by the page from analytics_data
+    return render_template('admin/analytics.html', job_count=counts['jobs'],
+                            application_count=counts['applications'],
+                            student_count=counts['students'])
+
+@admin_bp.route('/analytics/data')
+@login_required
+@admin_required
+def analytics_data():
+    from rollups import chart_data
+    from flask import jsonify
+    days = max(1, min(request.args.get('days', 30, type=int), 366))
+    return jsonify(chart_data(days))
 
 @admin_bp.route('/students/<int:student_id>/resume')
 @login_required
 @admin_required
 def download_resume(student_id):
     student = Student.query.get_or_404(student_id)
-    return send_file(student.resume, as_attachment=True)
+    response = send_resume(student, as_attachment=True)
+    if response is None:
+        flash("Resume file not found on server.", "danger")
+        return redirect(url_for('admin.view_students'))
+    return response
 
 @admin_bp.route('/applicants/download/all')# all jobs combined
 @login_required
 @admin_required
 def download_all_applicants():
-    from openpyxl import Workbook
-    from io import BytesIO
-    from flask import send_file
+    from exports import applicant_rows, csv_response, xlsx_response, ALL_APPLICANT_HEADERS
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "All Applicants"
-    ws.append(["Job Title", "Student Name", "Email", "Resume", "Status", "Applied On"])
+    rows = applicant_rows()
 
-    applications = Application.query.order_by(Application.applied_on.desc()).all()
+    if request.args.get('format') == 'csv':
+        return csv_response("all_applicants.csv", ALL_APPLICANT_HEADERS, rows)
+    return xlsx_response("all_applicants.xlsx", "All Applicants", ALL_APPLICANT_HEADERS, rows)
 
-    for app in applications:
-        student = app.student
-        user = student.user
-        ws.append([
-            app.job.title,
-            student.name,
-            user.email,
-            student.resume,
-            app.status,
-            app.applied_on.strftime("%Y-%m-%d %H:%M")
-        ])
 
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
+#---------BACKGROUND EXPORTS---------
+@admin_bp.route('/exports', methods=['POST'])
+@login_required
+@admin_required
+def start_export():
+    from exports import enqueue_export
 
-    return send_file(output, download_name="all_applicants.xlsx", as_attachment=True)
+    job_id = request.form.get('job_id', type=int)
+    file_format = request.form.get('format', 'xlsx')
+    if file_format not in ('xlsx', 'csv'):
+        file_format = 'xlsx'
+    if job_id is not None:
+        Job.query.get_or_404(job_id)
+
+    export = enqueue_export(job_id=job_id, file_format=file_format, user_id=current_user.id)
+    return redirect(url_for('admin.export_status', export_id=export.id))
+
+@admin_bp.route('/exports/<int:export_id>')
+@login_required
+@admin_required
+def export_status(export_id):
+    from models import ExportJob
+    from exports import expire_stale_exports
+    expire_stale_exports()
+    export = ExportJob.query.get_or_404(export_id)
+    return render_template('admin/export_status.html', export=export)
+
+@admin_bp.route('/exports/<int:export_id>/status')
+@login_required
+@admin_required
+def export_status_json(export_id):
+    from models import ExportJob
+    from exports import expire_stale_exports
+    expire_stale_exports()
+    from flask import jsonify
+    export = ExportJob.query.get_or_404(export_id)
+    return jsonify({
+        "id": export.id,
+        "status": export.status,
+        "row_count": export.row_count,
+        "error": export.error,
+        "download_url": url_for('admin.download_export', export_id=export.id) if export.status == 'done' else None
+    })
+
+@admin_bp.route('/exports/<int:export_id>/download')
+@login_required
+@admin_required
+def download_export(export_id):
+    from models import ExportJob
+    from exports import export_folder
+    export = ExportJob.query.get_or_404(export_id)
+    if export.status != 'done':
+        flash("This export is not ready yet.", "warning")
+        return redirect(url_for('admin.export_status', export_id=export.id))
+    return send_from_directory(export_folder(), export.filename, as_attachment=True)
 
 
 @admin_bp.route('/students')
 @login_required
 @admin_required
 def view_students():
-    students = Student.query.all()
-    return render_template('admin/students.html', students=students)
+    page = paginate(Student.query.options(joinedload(Student.user)), (Student.id,))
+    return render_template('admin/students.html', students=page.items, page=page)
 
 @admin_bp.route('/resume/view/<int:student_id>')
 @login_required
 @admin_required
 def view_resume(student_id):
     student = Student.query.get_or_404(student_id)
-    print("Student ID:", student_id)
-    print("Resume path in DB:", student.resume)
 
     if not student.resume:
         flash("This student has not uploaded a resume.", "warning")
         return redirect(url_for('admin.view_students'))
 
-    resume_folder = os.path.join(current_app.root_path, 'static', 'resumes')
-    resume_filename = os.path.basename(student.resume)
-    resume_path = os.path.join(resume_folder, resume_filename)
-
-    print("Full resume path:", resume_path)
-
-    if not os.path.exists(resume_path):
+    response = send_resume(student, as_attachment=False)
+    if response is None:
         flash("Resume file not found on server.", "danger")
         return redirect(url_for('admin.view_students'))
 
-    return send_from_directory(directory=resume_folder, path=resume_filename, as_attachment=False)
+    return response
+
+
+#---------METRICS---------
+@admin_bp.route('/metrics')
+def metrics():
+    from metrics import CONTENT_TYPE, render_metrics, scrape_token_matches
+    # admins, or a scraper with the METRICS_TOKEN bearer token
+    if not scrape_token_matches() and not (current_user.is_authenticated and current_user.role == 'admin'):
+        return "Access Denied: Admins Only", 403
+    return current_app.response_class(render_metrics(), content_type=CONTENT_TYPE)
+
+
+#---------PROFILING---------
+@admin_bp.route('/profiling', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def profiling():
+    import profiling as diagnostics
+    if request.method == 'POST':
+        sample_rate = request.form.get('sample_rate', type=float)
+        if sample_rate is None or not 0 <= sample_rate <= 1:
+            flash('The sample rate must be between 0 and 1.', 'danger')
+        else:
+            diagnostics.settings.save(current_app, 'enabled' in request.form, sample_rate)
+            flash('Profiler settings saved.', 'success')
+        return redirect(url_for('admin.profiling'))
+
+    return render_template(
+        'admin/profiling.html',
+        settings=diagnostics.settings.get(current_app),
+        profiles=diagnostics.list_profiles(),
+        slow_queries=list(reversed(diagnostics.slow_queries)),
+        n_plus_one_reports=list(reversed(diagnostics.n_plus_one_reports)),
+    )
+
+@admin_bp.route('/profiling/<name>')
+@login_required
+@admin_required
+def download_profile(name):
+    from profiling import PROFILE_SUFFIX, profile_folder
+    if not name.endswith(PROFILE_SUFFIX):
+        return "Not Found", 404
+    return send_from_directory(profile_folder(), name, as_attachment=True, mimetype='text/plain')
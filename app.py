@@ -1,24 +1,36 @@
 from flask import Flask
 from extensions import db, migrate, login_manager
 from config import Config
+import database
+import metrics
+import profiling
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
-    # Initialize extensions
+    # Initialize extensions; engine pooling and SQLite pragmas, see database.py
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', database.engine_options(app.config))
     db.init_app(app)
+    database.init_app(app)
+    # Both put their before_request hook first in line, so metrics goes
+    # last: its clock then starts before the profiler's hook runs
+    profiling.init_app(app)  # sampling profiler, slow-query log, N+1 detector
+    metrics.init_app(app)  # per-endpoint latency, SQL and template timings
     migrate.init_app(app, db)
     login_manager.login_view = 'auth.login'
     login_manager.init_app(app)
 
     # Import models (required for migrations to recognize them)
     from models import User, Job, Application
+    import counters  # registers the counter-maintenance session hook
+    import rollups  # registers the analytics rollup session hook
+    import identity  # registers the identity cache eviction hooks
 
-    # User loader for Flask-Login
+    # User loader for Flask-Login; cached, see identity.py
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return identity.load_user(int(user_id))
 
     # Register blueprints
     from main.routes import main_bp
@@ -31,6 +43,31 @@ def create_app():
     app.register_blueprint(student_bp, url_prefix='/student')
     app.register_blueprint(admin_bp, url_prefix='/admin')
 
+    # CLI commands
+    from search import rebuild_search_index_command
+    from counters import reconcile_counters_command
+    from query_plans import check_query_plans_command
+    from rollups import rebuild_rollups_command
+    from resume_storage import import_legacy_resumes_command
+    from resume_search import extract_resumes_command, rebuild_resume_index_command
+    from recommendations import refresh_recommendations_command
+    from job_similarity import build_similarity_index_command
+    from database import benchmark_writes_command
+    from job_feed import benchmark_job_feed_command
+    from benchmarks.commands import bench_cli
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(reconcile_counters_command)
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(rebuild_rollups_command)
+    app.cli.add_command(import_legacy_resumes_command)
+    app.cli.add_command(extract_resumes_command)
+    app.cli.add_command(rebuild_resume_index_command)
+    app.cli.add_command(refresh_recommendations_command)
+    app.cli.add_command(build_similarity_index_command)
+    app.cli.add_command(benchmark_writes_command)
+    app.cli.add_command(benchmark_job_feed_command)
+    app.cli.add_command(bench_cli)
+
     return app
 
 # Create the app instance
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from sqlalchemy import or_, select, update
+
+import rollups
+from extensions import db
+from models import Application, Job
+
+# Statuses an admin can move an application to.
+APPLICATION_STATUSES = ('Under Review', 'Interview Scheduled', 'Selected', 'Rejected')
+
+
+def bulk_update_status(status, application_ids=None, job_id=None, from_status=None):
+    """Set `status` on many applications with one UPDATE; return the row count.
+
+    Targets the given `application_ids`, or every application matching
+    `job_id` and/or `from_status` (e.g. all pending applications for a
+    job). At least one criterion is required. Rows already in `status`
+    are left alone and not counted.
+    """
+    if status not in APPLICATION_STATUSES:
+        raise ValueError(f'Unknown status: {status}')
+
+    criteria = []
+    if application_ids is not None:
+        criteria.append(Application.id.in_(application_ids))
+    if job_id is not None:
+        criteria.append(Application.job_id == job_id)
+    if from_status is not None:
+        criteria.append(Application.status == from_status)
+    if not criteria:
+        raise ValueError('Choose applications to update.')
+    criteria.append(or_(Application.status != status, Application.status.is_(None)))
+
+    connection = db.session.connection()
+
+    # RETURNING reports exactly the rows this UPDATE changed, so the
+    # rollups agree with it even if another request changed some statuses
+    # in the meantime.
+    changed = connection.execute(
+        update(Application).where(*criteria).values(status=status)
+        .returning(Application.id, Application.job_id)
+    ).all()
+
+    # The UPDATE bypasses the session's flush hooks, so roll up the status
+    # changes per category here, in the same transaction.
+    job_ids = {job_id for _, job_id in changed}
+    categories = dict(connection.execute(
+        select(Job.id, Job.category_id).where(Job.id.in_(job_ids))
+    ).all()) if job_ids else {}
+    today = datetime.utcnow().date()
+    rollups.record(connection, [
+        (today, rollups.STATUS_PREFIX + status, categories.get(job_id)) for _, job_id in changed
+    ])
+    db.session.commit()
+    return len(changed)
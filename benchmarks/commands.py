@@ -0,0 +1,184 @@
+import json
+import os
+import platform
+import subprocess
+import threading
+from datetime import datetime
+
+import click
+from flask import current_app
+from sqlalchemy import func, select
+
+from benchmarks.dataset import bench_students, generate
+from benchmarks.load import ClientSession, HttpSession, LocalServer, login, run_scenario
+from benchmarks.scenarios import SCENARIOS
+from counters import get_counts
+from extensions import db
+from models import Job
+
+# `flask bench seed` fills a database with synthetic data, `flask bench
+# run` loads the hot routes and writes a JSON report, and `flask bench
+# compare` diffs two reports, e.g. from before and after a change:
+#
+#   flask bench seed --jobs 50000 --students 200000 --applications 2000000
+#   flask bench run --output before.json
+#   ... change code ...
+#   flask bench run --output after.json
+#   flask bench compare before.json after.json
+
+
+def _git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=current_app.root_path,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=current_app.root_path,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f'{commit}-dirty' if dirty else commit
+
+
+def _default_output(commit):
+    folder = os.path.join(current_app.instance_path, 'benchmarks')
+    os.makedirs(folder, exist_ok=True)
+    stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+    return os.path.join(folder, f'{stamp}-{commit or "nogit"}.json')
+
+
+def _session_opener(role, concurrency, new_session):
+    """open_session(index) for run_scenario: signed in as `role`, one student per thread."""
+    accounts = []
+    if role == 'admin':
+        accounts = [(current_app.config['ADMIN_EMAIL'], current_app.config['ADMIN_PASSWORD'])] * concurrency
+    elif role == 'student':
+        accounts = bench_students(concurrency)
+        if len(accounts) < concurrency:
+            raise click.ClickException('Not enough generated students; run `flask bench seed` first.')
+
+    # the first admin login creates the admin user; parallel first logins
+    # would race to insert it
+    lock = threading.Lock() if role == 'admin' else None
+
+    def open_session(index):
+        session = new_session()
+        if lock:
+            with lock:
+                login(session, *accounts[index])
+        elif accounts:
+            login(session, *accounts[index])
+        return session
+    return open_session
+
+
+@click.group('bench')
+def bench_cli():
+    """Synthetic data and load benchmarks for the hot routes."""
+
+
+@bench_cli.command('seed')
+@click.option('--jobs', default=50000, show_default=True)
+@click.option('--students', default=200000, show_default=True)
+@click.option('--applications', default=2000000, show_default=True, help='Target count; duplicates are dropped.')
+@click.option('--seed', default=42, show_default=True, help='Same seed and counts, same rows.')
+@click.option('--batch-size', default=5000, show_default=True, help='Rows per INSERT batch.')
+def seed_command(jobs, students, applications, seed, batch_size):
+    """Bulk-insert a seeded synthetic dataset."""
+    result = generate(jobs, students, applications, seed=seed, batch_size=batch_size, echo=click.echo)
+    click.echo(json.dumps(result, indent=2))
+    click.echo('Similar-jobs and recommendation data are not built; run `flask build-similarity-index` '
+               'and `flask refresh-recommendations --full` if the runs should include them.')
+
+
+@bench_cli.command('run')
+@click.option('--scenario', 'names', multiple=True, type=click.Choice(list(SCENARIOS)),
+              help='Scenario to run; repeat for several. Default: all.')
+@click.option('--driver', type=click.Choice(['client', 'http']), default='client', show_default=True,
+              help='In-process test client, or HTTP against a local threaded server.')
+@click.option('--url', help='With --driver http: load this running server instead; it must use this database.')
+@click.option('--concurrency', default=8, show_default=True, help='Worker threads per scenario.')
+@click.option('--duration', default=10.0, show_default=True, help='Measured seconds per scenario.')
+@click.option('--warmup', default=2.0, show_default=True, help='Unmeasured seconds before each scenario.')
+@click.option('--seed', default=1, show_default=True)
+@click.option('--output', type=click.Path(dir_okay=False), help='Report path. Default: <instance>/benchmarks/.')
+def run_command(names, driver, url, concurrency, duration, warmup, seed, output):
+    """Load the hot routes and write a JSON latency/throughput report."""
+    app = current_app._get_current_object()
+    scenarios = [SCENARIOS[name] for name in names or SCENARIOS]
+    job_ids = db.session.execute(select(Job.id).order_by(func.random()).limit(2000)).scalars().all()
+    if not job_ids:
+        raise click.ClickException('No jobs to load; run `flask bench seed` first.')
+    dataset = get_counts()
+
+    commit = _git_commit()
+    report = {
+        'created': datetime.utcnow().isoformat(timespec='seconds'),
+        'commit': commit,
+        'driver': driver,
+        'url': url,
+        'concurrency': concurrency,
+        'duration': duration,
+        'warmup': warmup,
+        'seed': seed,
+        'database': db.engine.dialect.name,
+        'dataset': dataset,
+        'python': platform.python_version(),
+        'scenarios': {},
+    }
+
+    def run_all(new_session):
+        for scenario in scenarios:
+            open_session = _session_opener(scenario.role, concurrency, new_session)
+            db.session.remove()  # don't hold this connection through the run
+            result = run_scenario(scenario, open_session, concurrency, job_ids, duration, warmup, seed)
+            report['scenarios'][scenario.name] = result
+            latency = result['latency_ms']
+            click.echo(f"{scenario.name:26}{result['throughput']:>9.1f} req/s  p50 {latency['p50']:>8.1f}  "
+                       f"p95 {latency['p95']:>8.1f}  p99 {latency['p99']:>8.1f} ms  errors {result['errors']}")
+
+    if driver == 'client':
+        run_all(lambda: ClientSession(app))
+    elif url:
+        run_all(lambda: HttpSession(url))
+    else:
+        with LocalServer(app) as server:
+            run_all(lambda: HttpSession(server.url))
+
+    output = output or _default_output(commit)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    click.echo(f'Report written to {output}')
+
+
+def _change(old, new):
+    return (new - old) / old * 100 if old else 0.0
+
+
+@bench_cli.command('compare')
+@click.argument('baseline', type=click.File())
+@click.argument('candidate', type=click.File())
+@click.option('--threshold', default=10.0, show_default=True,
+              help='Percent drop in throughput or rise in p95 reported as a regression.')
+def compare_command(baseline, candidate, threshold):
+    """Compare two reports scenario by scenario; fail on regressions."""
+    old, new = json.load(baseline), json.load(candidate)
+    click.echo(f"baseline {old.get('commit')} ({old.get('driver')}), candidate {new.get('commit')} ({new.get('driver')})")
+    click.echo(f"{'scenario':26}{'req/s':>20}{'change':>9}{'p95 ms':>22}{'change':>9}")
+    regressions = []
+    for name, after in new['scenarios'].items():
+        before = old['scenarios'].get(name)
+        if before is None:
+            click.echo(f'{name:26}  (not in baseline)')
+            continue
+        throughput = _change(before['throughput'], after['throughput'])
+        p95 = _change(before['latency_ms']['p95'], after['latency_ms']['p95'])
+        flag = throughput < -threshold or p95 > threshold
+        if flag:
+            regressions.append(name)
+        click.echo(
+            f"{name:26}{before['throughput']:>9.1f} -> {after['throughput']:>7.1f}{throughput:>+8.1f}%"
+            f"{before['latency_ms']['p95']:>10.1f} -> {after['latency_ms']['p95']:>8.1f}{p95:>+8.1f}%"
+            f"{'  REGRESSION' if flag else ''}"
+        )
+    if regressions:
+        raise click.ClickException(f"{len(regressions)} scenario(s) regressed by more than {threshold:g}%: "
+                                   f"{', '.join(regressions)}")
@@ -0,0 +1,243 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import func, insert, select, text
+from werkzeug.security import generate_password_hash
+
+import counters
+import rollups
+from applications import APPLICATION_STATUSES
+from extensions import db
+from models import Application, Category, Job, Student, User, summarize
+
+# Seeded synthetic dataset for the benchmark suite.
+#
+# Rows are written with Core executemany() inserts in batches, with their
+# ids assigned here, so the generator never round-trips per row. Those
+# inserts skip the session hooks, so the site counters and analytics
+# rollups are recomputed from the tables once everything is in. The same
+# seed and counts produce the same rows.
+#
+# Every generated student can sign in as `bench<user id>@example.com`
+# with BENCH_PASSWORD; the load scenarios log in as them.
+BENCH_EMAIL = 'bench{}@example.com'
+BENCH_PASSWORD = 'benchmark'
+
+CATEGORIES = ('Engineering', 'Data', 'Design', 'Product', 'Marketing', 'Sales', 'Operations', 'Finance')
+LOCATIONS = ('Remote', 'New York', 'San Francisco', 'Austin', 'Chicago', 'Seattle', 'Boston', 'Denver',
+             'London', 'Berlin', 'Bangalore', 'Toronto')
+JOB_TYPES = ('Full-time', 'Part-time', 'Internship', 'Contract')
+EXPERIENCE_LEVELS = ('Entry Level', 'Mid Level', 'Senior Level', 'Executive')
+SKILLS = ('python', 'flask', 'django', 'sql', 'postgres', 'react', 'typescript', 'java', 'kotlin', 'go',
+          'rust', 'c++', 'aws', 'gcp', 'docker', 'kubernetes', 'terraform', 'spark', 'pandas', 'tableau',
+          'figma', 'excel', 'salesforce', 'seo', 'linux', 'graphql', 'redis', 'kafka', 'ml', 'nlp')
+ROLES = ('Developer', 'Engineer', 'Analyst', 'Designer', 'Manager', 'Intern', 'Consultant', 'Specialist',
+         'Architect', 'Scientist')
+WORDS = ('build', 'scale', 'team', 'customers', 'platform', 'product', 'services', 'data', 'design',
+         'deliver', 'improve', 'reliable', 'fast', 'growth', 'mentor', 'ownership', 'roadmap', 'users',
+         'quality', 'testing', 'deploy', 'collaborate', 'analytics', 'pipeline', 'mobile', 'web', 'api',
+         'support', 'research', 'strategy', 'security', 'cloud', 'automation', 'dashboard', 'reporting')
+FIRST_NAMES = ('Aarav', 'Maya', 'Liam', 'Zoe', 'Noah', 'Isha', 'Omar', 'Lena', 'Kai', 'Priya', 'Mateo',
+               'Hana', 'Ethan', 'Sara', 'Ravi', 'Chloe', 'Yusuf', 'Nora', 'Arjun', 'Emma')
+LAST_NAMES = ('Sharma', 'Smith', 'Garcia', 'Chen', 'Okafor', 'Müller', 'Kim', 'Patel', 'Rossi', 'Silva',
+              'Nguyen', 'Cohen', 'Khan', 'Ivanova', 'Brown', 'Tanaka', 'Reddy', 'Lopez', 'Dubois', 'Ali')
+
+# Jobs are posted over this many days before now; applications arrive
+# between a job's posting and now.
+HISTORY_DAYS = 365
+
+# Application popularity follows a power law over jobs: a few postings
+# draw many applicants, most draw a handful.
+POPULARITY_EXPONENT = 0.8
+
+
+def _next_id(model):
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def _insert(model, rows):
+    if rows:
+        db.session.execute(insert(model), rows)
+        db.session.commit()
+
+
+def _categories():
+    existing = dict(db.session.query(Category.name, Category.id))
+    missing = [{'name': name} for name in CATEGORIES if name not in existing]
+    _insert(Category, missing)
+    existing = dict(db.session.query(Category.name, Category.id))
+    return [existing[name] for name in CATEGORIES]
+
+
+def _sentence(rng, skills):
+    words = rng.sample(WORDS, 8) + list(skills)
+    rng.shuffle(words)
+    return ' '.join(words).capitalize() + '.'
+
+
+def _jobs(rng, count, batch_size, now, echo):
+    category_ids = _categories()
+    first_id = _next_id(Job)
+    posted = []
+    for start in range(0, count, batch_size):
+        rows = []
+        for job_id in range(first_id + start, first_id + min(start + batch_size, count)):
+            skills = rng.sample(SKILLS, 3)
+            description = ' '.join(_sentence(rng, skills) for _ in range(rng.randint(6, 14)))
+            min_salary = rng.randrange(20, 180) * 1000
+            posted_on = now - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+            rows.append({
+                'id': job_id,
+                'title': f'{rng.choice(EXPERIENCE_LEVELS).split()[0]} {skills[0].title()} {rng.choice(ROLES)}',
+                'company': f'{rng.choice(LAST_NAMES)} {rng.choice(("Labs", "Systems", "Group", "Works", "Inc"))}',
+                'location': rng.choice(LOCATIONS),
+                'description': description,
+                'summary': summarize(description),
+                'job_type': rng.choice(JOB_TYPES),
+                'experience_level': rng.choice(EXPERIENCE_LEVELS),
+                'min_salary': min_salary,
+                'max_salary': min_salary + rng.randrange(0, 60) * 1000,
+                'category_id': rng.choice(category_ids),
+                'tags': ','.join(skills),
+                'posted_on': posted_on,
+            })
+            posted.append(posted_on)
+        _insert(Job, rows)
+        echo(f'  jobs: {start + len(rows)}/{count}')
+    return first_id, posted
+
+
+def _students(rng, count, batch_size, echo):
+    # one hash for every account: hashing 200k passwords would take hours
+    password = generate_password_hash(BENCH_PASSWORD)
+    first_user_id = _next_id(User)
+    first_student_id = _next_id(Student)
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        users, students = [], []
+        for i in range(start, start + size):
+            user_id = first_user_id + i
+            name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+            users.append({'id': user_id, 'email': BENCH_EMAIL.format(user_id), 'password': password, 'role': 'student'})
+            students.append({
+                'id': first_student_id + i,
+                'user_id': user_id,
+                'name': name,
+                'cgpa': round(rng.uniform(5.0, 10.0), 2),
+                'experience': _sentence(rng, rng.sample(SKILLS, 4)),
+                'phone': f'555{rng.randrange(10 ** 7):07d}',
+                'address': f'{rng.randrange(1, 999)} {rng.choice(WORDS).title()} Street, {rng.choice(LOCATIONS)}',
+            })
+        _insert(User, users)
+        _insert(Student, students)
+        echo(f'  students: {start + size}/{count}')
+    return first_student_id
+
+
+def _applications(np_rng, count, students, first_student_id, jobs, first_job_id, posted, batch_size, now, echo):
+    if not (count and students and jobs):
+        return 0
+    weights = 1.0 / np.arange(1, jobs + 1) ** POPULARITY_EXPONENT
+    popularity = np.cumsum(np_rng.permutation(weights))
+    popularity /= popularity[-1]
+    posted_ts = np.array([p.timestamp() for p in posted])
+    now_ts = now.timestamp()
+    statuses = ('pending',) + APPLICATION_STATUSES
+    status_p = (0.6, 0.15, 0.1, 0.05, 0.1)
+
+    first_id = _next_id(Application)
+    inserted = 0
+    per_batch = max(1, batch_size * students // count)  # students per batch, for ~batch_size rows
+    for start in range(0, students, per_batch):
+        size = min(per_batch, students - start)
+        # this batch's share of the total, spread unevenly over its students
+        wanted = count * (start + size) // students - count * start // students
+        student_idx = np.sort(np_rng.integers(start, start + size, wanted))
+        job_idx = np.minimum(np.searchsorted(popularity, np_rng.random(wanted)), jobs - 1)
+        # a student applies to a job once
+        pairs = np.unique(student_idx.astype(np.int64) * jobs + job_idx)
+        student_idx, job_idx = pairs // jobs, pairs % jobs
+        applied_ts = posted_ts[job_idx] + np_rng.random(len(pairs)) * (now_ts - posted_ts[job_idx])
+        status_idx = np_rng.choice(len(statuses), len(pairs), p=status_p)
+        rows = [
+            {
+                'id': first_id + inserted + i,
+                'student_id': first_student_id + int(s),
+                'job_id': first_job_id + int(j),
+                'applied_on': datetime.fromtimestamp(float(t)),
+                'status': statuses[k],
+            }
+            for i, (s, j, t, k) in enumerate(zip(student_idx, job_idx, applied_ts, status_idx))
+        ]
+        _insert(Application, rows)
+        inserted += len(rows)
+        echo(f'  applications: {inserted}/~{count}')
+    return inserted
+
+
+def _reset_sequences():
+    # explicit ids leave PostgreSQL's serial sequences behind
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for model in (Job, User, Student, Application):
+        table = model.__table__.name
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM \"{table}\"))"
+        ))
+    db.session.commit()
+
+
+def generate(jobs, students, applications, seed=42, batch_size=5000, echo=print):
+    """Insert a synthetic dataset; return what was inserted, with timings.
+
+    Adds to whatever the database already holds. `applications` is a
+    target: a student's duplicate picks of the same job are dropped, so a
+    few less may be inserted.
+    """
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    timings = {}
+
+    started = time.perf_counter()
+    first_job_id, posted = _jobs(rng, jobs, batch_size, now, echo)
+    timings['jobs'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    first_student_id = _students(rng, students, batch_size, echo)
+    timings['students'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    inserted = _applications(np_rng, applications, students, first_student_id, jobs, first_job_id, posted,
+                             batch_size, now, echo)
+    timings['applications'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    _reset_sequences()
+    counters.reconcile()
+    counters.bump(db.session.connection(), counters.JOBS_VERSION, 1)
+    db.session.commit()
+    rollups.rebuild()
+    timings['counters_and_rollups'] = time.perf_counter() - started
+
+    return {
+        'jobs': jobs,
+        'students': students,
+        'applications': inserted,
+        'seconds': {step: round(seconds, 2) for step, seconds in timings.items()},
+    }
+
+
+def bench_students(limit):
+    """(email, password) of up to `limit` generated students."""
+    emails = db.session.execute(
+        select(User.email)
+        .join(Student, Student.user_id == User.id)
+        .where(User.email.like(BENCH_EMAIL.format('%')))
+        .order_by(User.id)
+        .limit(limit)
+    ).scalars()
+    return [(email, BENCH_PASSWORD) for email in emails]
@@ -0,0 +1,176 @@
+import http.cookiejar
+import logging
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from werkzeug.serving import make_server
+
+# Load generation for the benchmark scenarios.
+#
+# Two drivers send the same requests: 'client' calls the app in-process
+# through Flask's test client, measuring the app alone; 'http' goes over
+# real sockets to a threaded local server (or to --url), adding the
+# server and network stack. Each worker thread has its own signed-in
+# session and sends requests back to back for the scenario's duration;
+# requests finishing during the warm-up are not counted.
+
+_CSRF_RE = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+
+
+class ClientSession:
+    """Requests through the Flask test client, in-process."""
+
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def request(self, method, path, data=None):
+        response = self._client.open(path, method=method, data=data)
+        body = response.get_data()  # drains streamed responses too
+        response.close()
+        return response.status_code, body
+
+
+class _NoRedirects(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpSession:
+    """Requests over HTTP to `base_url`, with their own cookie jar."""
+
+    def __init__(self, base_url):
+        self._base_url = base_url.rstrip('/')
+        self._opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirects()
+        )
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        req = urllib.request.Request(self._base_url + path, data=body, method=method)
+        try:
+            with self._opener.open(req, timeout=60) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as error:  # includes redirects, which are not followed
+            with error:
+                return error.code, error.read()
+
+
+def login(session, email, password):
+    """Sign `session` in through the login form; raise RuntimeError if refused."""
+    status, page = session.request('GET', '/auth/login')
+    token = _CSRF_RE.search(page.decode())
+    data = {'email': email, 'password': password}
+    if token:
+        data['csrf_token'] = token.group(1)
+    status, _ = session.request('POST', '/auth/login', data)
+    if status != 302:
+        raise RuntimeError(f'Could not sign in as {email} (HTTP {status}).')
+
+
+class LocalServer:
+    """The app on a threaded werkzeug server on a free local port."""
+
+    def __init__(self, app):
+        self._server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.url = f'http://127.0.0.1:{self._server.port}'
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        # one access log line per request would swamp the output
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._thread.join()
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+def summarize_samples(samples, elapsed):
+    """Throughput and latency figures for `(seconds, status, ok)` samples."""
+    latencies = sorted(seconds * 1000 for seconds, _, _ in samples)
+    statuses = {}
+    for _, status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, _, ok in samples if not ok),
+        'throughput': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50), 3),
+            'p95': round(percentile(latencies, 95), 3),
+            'p99': round(percentile(latencies, 99), 3),
+            'mean': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            'max': round(latencies[-1], 3) if latencies else 0.0,
+        },
+        'statuses': statuses,
+    }
+
+
+def run_scenario(scenario, open_session, concurrency, job_ids, duration, warmup, seed):
+    """Drive `scenario` from `concurrency` threads; return its summary.
+
+    Each thread gets its session from `open_session(index)` and signs in
+    on its own thread: with the test client, requests made on a thread
+    that already has an app context (like a CLI command's) would all
+    share that context's `g` and database session.
+    """
+    samples = []
+    failures = []
+    lock = threading.Lock()
+    window = {}
+
+    def start_clock():
+        window['from'] = time.perf_counter() + warmup
+        window['until'] = window['from'] + duration
+
+    ready = threading.Barrier(concurrency, action=start_clock)
+
+    def worker(index):
+        try:
+            session = open_session(index)
+        except Exception as error:
+            failures.append(error)
+            ready.abort()
+            return
+        try:
+            ready.wait()
+        except threading.BrokenBarrierError:
+            return
+        rng = random.Random(f'{seed}:{scenario.name}:{index}')
+        local = []
+        while True:
+            method, path, data = scenario.build(rng, job_ids)
+            sent = time.perf_counter()
+            if sent >= window['until']:
+                break
+            try:
+                status, _ = session.request(method, path, data)
+            except Exception:  # a failed request is a sample, not a crash
+                status = 'exception'
+            done = time.perf_counter()
+            if done >= window['from']:
+                local.append((done - sent, status, status in scenario.expect))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if failures:
+        raise failures[0]
+    return summarize_samples(samples, time.perf_counter() - window['from'])
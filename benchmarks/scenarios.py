@@ -0,0 +1,47 @@
+from urllib.parse import urlencode
+
+from benchmarks.dataset import JOB_TYPES, ROLES, SKILLS
+
+# Scripted requests against the busiest routes. Each scenario builds one
+# request at a time from a worker's random generator, so runs with the
+# same seed send the same sequence. `role` says who the worker signs in
+# as: None (anonymous), 'student' or 'admin'.
+
+SEARCH_TERMS = SKILLS + tuple(role.lower() for role in ROLES)
+
+
+class Scenario:
+    def __init__(self, name, role, build, expect=(200,)):
+        self.name = name
+        self.role = role
+        self.build = build  # (rng, job_ids) -> (method, path, form data or None)
+        self.expect = expect  # statuses counted as success
+
+
+def _dashboard_search(rng, job_ids):
+    args = {'q': rng.choice(SEARCH_TERMS)}
+    if rng.random() < 0.5:
+        args['job_type'] = rng.choice(JOB_TYPES)
+    return 'GET', f'/student/dashboard?{urlencode(args)}', None
+
+
+def _filter_jobs_json(rng, job_ids):
+    args = {'job_type': rng.choice(JOB_TYPES)}
+    if rng.random() < 0.7:
+        args['q'] = rng.choice(SEARCH_TERMS)
+    return 'GET', f'/student/jobs/filter-json?{urlencode(args)}', None
+
+
+SCENARIOS = {
+    scenario.name: scenario for scenario in (
+        Scenario('home', None, lambda rng, job_ids: ('GET', '/', None)),
+        Scenario('student_dashboard_search', 'student', _dashboard_search),
+        Scenario('filter_jobs_json', 'student', _filter_jobs_json),
+        # redirects whether or not the student had applied already
+        Scenario('apply_job', 'student',
+                 lambda rng, job_ids: ('POST', f'/student/apply/{rng.choice(job_ids)}', {}), expect=(302,)),
+        Scenario('all_applications', 'admin', lambda rng, job_ids: ('GET', '/admin/applications', None)),
+        Scenario('export_applicants_csv', 'admin',
+                 lambda rng, job_ids: ('GET', f'/admin/applicants/download/{rng.choice(job_ids)}?format=csv', None)),
+    )
+}
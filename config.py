@@ -1,11 +1,51 @@
 import os
+import re
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'fallback_secret_key')
-    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///site.db')
+    # postgres:// is what some hosts hand out; SQLAlchemy only accepts postgresql://
+    SQLALCHEMY_DATABASE_URI = re.sub(r'^postgres://', 'postgresql://', os.getenv('DATABASE_URL', 'sqlite:///site.db'))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))  # seconds
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # seconds; PostgreSQL only
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000))  # milliseconds
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    IDENTITY_CACHE_TTL = int(os.getenv('IDENTITY_CACHE_TTL', 30))  # seconds
+    IDENTITY_CACHE_SIZE = int(os.getenv('IDENTITY_CACHE_SIZE', 1024))
+    PAGE_SIZE = int(os.getenv('PAGE_SIZE', 20))
+    MAX_PAGE_SIZE = 100
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
+    GZIP_MIN_SIZE = int(os.getenv('GZIP_MIN_SIZE', 1024))  # bytes; smaller JSON bodies are sent as is
+    RESUME_MAX_CONTENT_LENGTH = int(os.getenv('RESUME_MAX_CONTENT_LENGTH', 5 * 1024 * 1024))
+    RESUME_FOLDER = os.getenv('RESUME_FOLDER')  # defaults to <instance>/resumes
+    RESUME_CACHE_MAX_AGE = int(os.getenv('RESUME_CACHE_MAX_AGE', 3600))
+    RESUME_SENDFILE = os.getenv('RESUME_SENDFILE')  # 'x-sendfile' or 'x-accel-redirect'
+    RESUME_ACCEL_PREFIX = os.getenv('RESUME_ACCEL_PREFIX', '/protected/resumes/')
+    RESUME_EXTRACT_WORKERS = int(os.getenv('RESUME_EXTRACT_WORKERS', 1))
+    MATCH_TOP_K = int(os.getenv('MATCH_TOP_K', 10))
+    RECOMMENDATION_COUNT = int(os.getenv('RECOMMENDATION_COUNT', 20))  # stored per student
+    RECOMMENDATION_BATCH_SIZE = int(os.getenv('RECOMMENDATION_BATCH_SIZE', 500))
+    RECOMMENDATIONS_SHOWN = 6
+    EXPORT_FOLDER = os.getenv('EXPORT_FOLDER')  # defaults to <instance>/exports
+    EXPORT_WORKERS = int(os.getenv('EXPORT_WORKERS', 2))
+    EXPORT_FRESHNESS_SECONDS = int(os.getenv('EXPORT_FRESHNESS_SECONDS', 300))
+    EXPORT_TIMEOUT_SECONDS = int(os.getenv('EXPORT_TIMEOUT_SECONDS', 1800))  # queued/running longer counts as failed
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')  # lets Prometheus scrape /admin/metrics without logging in
+    PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', '0') == '1'  # until changed at /admin/profiling
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0.01))  # fraction of requests
+    PROFILE_HEADER = os.getenv('PROFILE_HEADER', 'X-Profile')  # profiles an admin's request when present
+    PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', 0.005))  # seconds between stack samples
+    PROFILE_FOLDER = os.getenv('PROFILE_FOLDER')  # defaults to <instance>/profiles
+    PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', 200))  # newest profiles kept on disk
+    SLOW_QUERY_MS = int(os.getenv('SLOW_QUERY_MS', 250))  # 0 turns the slow-query log off
+    N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', 10))  # repeats of one statement per request; 0 is off
     ADMIN_EMAIL = 'admin@brandlogic.com'
     ADMIN_PASSWORD = 'admin123'
\ No newline at end of file
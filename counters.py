@@ -0,0 +1,126 @@
+import click
+from sqlalchemy import event, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import Application, Job, SiteCounter, Student
+
+# Counter name -> model whose rows it counts.
+COUNTED_MODELS = {
+    'jobs': Job,
+    'students': Student,
+    'applications': Application,
+}
+_COUNTER_FOR_MODEL = {model: name for name, model in COUNTED_MODELS.items()}
+
+# Bumped on every insert, update or delete of a job, so cached job
+# listings can tell whether they are stale with one primary-key read.
+JOBS_VERSION = 'jobs_version'
+
+# Read on every job listing and JSON feed request, so built only once.
+_JOBS_VERSION_QUERY = select(SiteCounter.value).where(SiteCounter.name == JOBS_VERSION)
+
+
+def bump(connection, name, delta):
+    """Add `delta` to a counter on `connection`, inside its transaction.
+
+    Code that inserts or deletes counted rows without going through the
+    ORM session (bulk inserts, Core deletes) must call this itself.
+    """
+    if delta:
+        connection.execute(
+            update(SiteCounter)
+            .where(SiteCounter.name == name)
+            .values(value=SiteCounter.value + delta)
+        )
+
+
+def bump_jobs_version(connection):
+    """Bump the jobs version on `connection` and return the new value.
+
+    Code that writes jobs without going through the ORM session calls
+    this before writing, and stamps the rows' changed_version with it.
+    """
+    bump(connection, JOBS_VERSION, 1)
+    return connection.execute(_JOBS_VERSION_QUERY).scalar()
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_counted_rows(session, flush_context):
+    # Runs inside the flush, so counter updates commit or roll back
+    # together with the rows that caused them.
+    deltas = {}
+    for obj in session.new:
+        name = _COUNTER_FOR_MODEL.get(type(obj))
+        if name:
+            deltas[name] = deltas.get(name, 0) + 1
+    for obj in session.deleted:
+        name = _COUNTER_FOR_MODEL.get(type(obj))
+        if name:
+            deltas[name] = deltas.get(name, 0) - 1
+    changed_jobs = [
+        obj for obj in (*session.new, *session.deleted, *session.dirty)
+        if isinstance(obj, Job) and (obj in session.new or obj in session.deleted or session.is_modified(obj))
+    ]
+    if changed_jobs:
+        deltas[JOBS_VERSION] = 1
+    if deltas:
+        connection = session.connection()
+        for name, delta in deltas.items():
+            bump(connection, name, delta)
+    # stamp the jobs with the version they changed at, so caches can
+    # fetch just those (see matching.py)
+    stamped = [obj.id for obj in changed_jobs if obj not in session.deleted]
+    if stamped:
+        connection.execute(
+            update(Job)
+            .where(Job.id.in_(stamped))
+            .values(changed_version=_JOBS_VERSION_QUERY.scalar_subquery())
+        )
+
+
+def reconcile():
+    """Recompute every counter from the tables and return the new values."""
+    counts = {name: db.session.query(func.count(model.id)).scalar() for name, model in COUNTED_MODELS.items()}
+    for name, value in counts.items():
+        counter = db.session.get(SiteCounter, name)
+        if counter is None:
+            db.session.add(SiteCounter(name=name, value=value))
+        else:
+            counter.value = value
+    db.session.commit()
+    return counts
+
+
+def get_counts():
+    """Return {'jobs': n, 'students': n, 'applications': n} from the counter table.
+
+    One primary-key range read instead of three COUNT(*) scans; if any
+    counter is missing the table is reconciled first.
+    """
+    counts = dict(db.session.query(SiteCounter.name, SiteCounter.value).all())
+    if any(name not in counts for name in COUNTED_MODELS):
+        counts = reconcile()
+    return counts
+
+
+def get_jobs_version():
+    """Return the current job-table version, creating the counter if needed."""
+    version = db.session.execute(_JOBS_VERSION_QUERY).scalar()
+    if version is None:
+        db.session.add(SiteCounter(name=JOBS_VERSION, value=0))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another worker created it first
+            db.session.rollback()
+        version = db.session.execute(_JOBS_VERSION_QUERY).scalar()
+    return version
+
+
+@click.command('reconcile-counters')
+def reconcile_counters_command():
+    """Recompute the job/student/application counters from scratch."""
+    for name, value in reconcile().items():
+        click.echo(f'{name}: {value}')
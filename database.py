@@ -0,0 +1,229 @@
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import click
+from flask import current_app
+from sqlalchemy import (Column, DateTime, Integer, MetaData, String, Table, create_engine, event,
+                        func, select)
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+
+from extensions import db
+
+# Engine configuration for the two supported backends.
+#
+# PostgreSQL gets a sized connection pool whose connections are recycled
+# and pinged before use, so a restarted server or a dropped idle
+# connection costs a reconnect rather than a 500.
+#
+# SQLite connections are set up by a connect-event hook: WAL journal mode
+# lets readers carry on while a write commits, and lets a write commit
+# while pages are being read, instead of every request queueing behind one
+# lock; busy_timeout makes a writer wait its turn instead of failing with
+# "database is locked"; synchronous=NORMAL only syncs at checkpoints,
+# which in WAL mode is still safe against corruption; and mmap reads pages
+# straight from the page cache.
+#
+# Transactions still BEGIN lazily: the driver only starts one at the first
+# write, so a request that reads and then writes never holds a read
+# snapshot that a concurrent commit could invalidate, and BEGIN IMMEDIATE
+# is not needed to avoid busy errors.
+_JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+_SYNCHRONOUS = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+
+
+def _is_sqlite_memory(url):
+    return url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory'
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database."""
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite':
+        if _is_sqlite_memory(url):
+            return {}  # a single shared connection, set up by Flask-SQLAlchemy
+        return {
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'pool_timeout': config['DB_POOL_TIMEOUT'],
+        }
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': True,
+    }
+
+
+def sqlite_pragmas(config):
+    """(name, value) pragmas run on every new SQLite connection, in order."""
+    journal_mode = config['SQLITE_JOURNAL_MODE'].upper()
+    synchronous = config['SQLITE_SYNCHRONOUS'].upper()
+    if journal_mode not in _JOURNAL_MODES:
+        raise ValueError(f'Unknown SQLITE_JOURNAL_MODE {journal_mode!r}')
+    if synchronous not in _SYNCHRONOUS:
+        raise ValueError(f'Unknown SQLITE_SYNCHRONOUS {synchronous!r}')
+    return [
+        # first, so switching the journal mode waits out other connections too
+        ('busy_timeout', int(config['SQLITE_BUSY_TIMEOUT'])),
+        ('journal_mode', journal_mode),
+        ('synchronous', synchronous),
+        ('mmap_size', int(config['SQLITE_MMAP_SIZE'])),
+    ]
+
+
+def apply_pragmas(engine, pragmas):
+    """Run `pragmas` on every connection `engine` opens from now on."""
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+
+def init_app(app):
+    """Hook the SQLite pragmas onto the app's engine; call after db.init_app."""
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name == 'sqlite':
+            apply_pragmas(engine, sqlite_pragmas(app.config))
+
+
+# ---------- Write benchmark ----------
+
+_bench_metadata = MetaData()
+_bench_table = Table(
+    'benchmark_write', _bench_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('worker', Integer, nullable=False),
+    Column('payload', String(200), nullable=False),
+    Column('created_on', DateTime, nullable=False),
+)
+
+
+class _Stats:
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.reads = 0
+
+
+def _write_loop(engine, worker, stop, stats):
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            # one small transaction per write, like an application submit
+            with engine.begin() as connection:
+                connection.execute(_bench_table.insert().values(
+                    worker=worker, payload='x' * 200, created_on=datetime.utcnow()
+                ))
+        except OperationalError:
+            stats.errors += 1
+        else:
+            stats.latencies.append(time.perf_counter() - start)
+
+
+def _read_loop(engine, stop, stats):
+    recent = select(_bench_table).order_by(_bench_table.c.id.desc()).limit(20)
+    total = select(func.count()).select_from(_bench_table)
+    while not stop.is_set():
+        try:
+            with engine.connect() as connection:
+                connection.execute(recent).all()
+                connection.execute(total).scalar()
+        except OperationalError:
+            stats.errors += 1
+        else:
+            stats.reads += 1
+
+
+def run_write_benchmark(engine, writers, readers, seconds):
+    """Hammer a scratch table from concurrent threads; return a result dict."""
+    _bench_metadata.drop_all(engine, checkfirst=True)
+    _bench_metadata.create_all(engine)
+    stop = threading.Event()
+    stats = _Stats()
+    threads = [threading.Thread(target=_write_loop, args=(engine, i, stop, stats)) for i in range(writers)]
+    threads += [threading.Thread(target=_read_loop, args=(engine, stop, stats)) for _ in range(readers)]
+    try:
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        stop.set()
+        _bench_metadata.drop_all(engine)
+
+    latencies = sorted(stats.latencies)
+    quantile = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+    return {
+        'writes_per_second': len(latencies) / seconds,
+        'reads_per_second': stats.reads / seconds,
+        'errors': stats.errors,
+        'p50_ms': statistics.median(latencies) * 1000 if latencies else 0.0,
+        'p99_ms': quantile(0.99),
+    }
+
+
+def _journal_mode(engine):
+    with engine.connect() as connection:
+        return connection.exec_driver_sql('PRAGMA journal_mode').scalar()
+
+
+@click.command('benchmark-writes')
+@click.option('--writers', default=8, show_default=True, help='Concurrent writing threads.')
+@click.option('--readers', default=4, show_default=True, help='Concurrent reading threads.')
+@click.option('--seconds', default=5.0, show_default=True, help='Duration of each run.')
+def benchmark_writes_command(writers, readers, seconds):
+    """Compare write throughput with default and configured engine settings.
+
+    With SQLite, each run gets a scratch database file of its own next to
+    the configured one, on the same disk, so the live file is never
+    written to and keeps its journal mode. Elsewhere, writes go to a
+    scratch table that is dropped afterwards.
+    """
+    url = db.engine.url
+    if url.get_backend_name() != 'sqlite':
+        _run_write_benchmarks([('default', create_engine(url)), ('configured', db.engine)],
+                              writers, readers, seconds)
+        return
+    if _is_sqlite_memory(url):
+        raise click.ClickException('The write benchmark needs a file database.')
+
+    config = current_app.config
+    folder = os.path.dirname(os.path.abspath(url.database))
+    with tempfile.TemporaryDirectory(prefix='benchmark-writes-', dir=folder) as scratch:
+        baseline = create_engine(url.set(database=os.path.join(scratch, 'default.db')))
+        # SQLite's own defaults
+        apply_pragmas(baseline, [('journal_mode', 'DELETE'), ('synchronous', 'FULL')])
+        configured = create_engine(url.set(database=os.path.join(scratch, 'configured.db')),
+                                   **engine_options(config))
+        apply_pragmas(configured, sqlite_pragmas(config))
+        _run_write_benchmarks([('default', baseline), ('configured', configured)], writers, readers, seconds)
+
+
+def _run_write_benchmarks(engines, writers, readers, seconds):
+    results = {}
+    for label, engine in engines:
+        mode = f' ({_journal_mode(engine)})' if engine.dialect.name == 'sqlite' else ''
+        click.echo(f'Running {label}{mode}: {writers} writers, {readers} readers, {seconds:g}s...')
+        results[label] = run_write_benchmark(engine, writers, readers, seconds)
+        if engine is not db.engine:
+            engine.dispose()
+
+    click.echo(f"{'':12}{'writes/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}{'reads/s':>10}")
+    for label, r in results.items():
+        click.echo(
+            f"{label:12}{r['writes_per_second']:>10.1f}{r['p50_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+            f"{r['errors']:>8}{r['reads_per_second']:>10.1f}"
+        )
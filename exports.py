@@ -0,0 +1,241 @@
+import csv
+import io
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import Response, current_app, send_file, stream_with_context
+
+from extensions import db
+from models import Application, ExportJob, Job, Student, User
+
+# Rows fetched from the database per round trip while exporting.
+EXPORT_BATCH_SIZE = 1000
+
+APPLICANT_HEADERS = ["Student Name", "Email", "Resume", "Status", "Applied On"]
+ALL_APPLICANT_HEADERS = ["Job Title"] + APPLICANT_HEADERS
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def applicant_rows(job_id=None):
+    """Yield export rows for one job's applicants, or for every job.
+
+    Selects only the exported columns with a single join instead of
+    loading Application/Student/User objects, and streams them from the
+    cursor in batches so memory use does not grow with the row count.
+    """
+    columns = [Student.name, User.email, Student.resume, Application.status, Application.applied_on]
+    if job_id is None:
+        columns.insert(0, Job.title)
+
+    query = (
+        db.session.query(*columns)
+        .select_from(Application)
+        .join(Student, Application.student_id == Student.id)
+        .join(User, Student.user_id == User.id)
+    )
+    if job_id is None:
+        query = query.join(Job, Application.job_id == Job.id)
+    else:
+        query = query.filter(Application.job_id == job_id)
+
+    for row in query.order_by(Application.applied_on.desc()).yield_per(EXPORT_BATCH_SIZE):
+        *values, applied_on = row
+        yield values + [applied_on.strftime("%Y-%m-%d %H:%M") if applied_on else None]
+
+
+def iter_csv(headers, rows):
+    """Encode rows as CSV, yielding roughly one chunk per batch of rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for i, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if i % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def write_xlsx(fileobj, title, headers, rows):
+    """Write rows to `fileobj` with a write-only workbook.
+
+    Write-only mode serialises each row as it is appended instead of
+    keeping every cell in memory, so the workbook stays small however many
+    rows go into it.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    ws.append(headers)
+    for row in rows:
+        ws.append(row)
+    wb.save(fileobj)
+
+
+def csv_response(filename, headers, rows):
+    response = Response(
+        stream_with_context(iter_csv(headers, rows)),
+        mimetype='text/csv'
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def xlsx_response(filename, title, headers, rows):
+    # The workbook is spooled to a temporary file rather than BytesIO; the
+    # file is streamed back in chunks and removed once the response closes.
+    output = tempfile.TemporaryFile()
+    write_xlsx(output, title, headers, rows)
+    output.seek(0)
+    return send_file(
+        output,
+        mimetype=XLSX_MIMETYPE,
+        download_name=filename,
+        as_attachment=True
+    )
+
+
+# ---------- Background exports ----------
+#
+# Large exports run in a small local process pool instead of the web
+# worker. Each export is an ExportJob row, which is how the status
+# endpoint (served by any web process) sees progress; finished files are
+# written to EXPORT_FOLDER and served from there.
+
+_executor = None
+
+
+def export_folder(app=None):
+    app = app or current_app
+    folder = app.config.get('EXPORT_FOLDER') or os.path.join(app.instance_path, 'exports')
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def export_filename(export):
+    scope = f"job_{export.job_id}" if export.job_id is not None else "all"
+    return f"applicants_{scope}_{export.id}.{export.file_format}"
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # spawn rather than fork: children must not share the parent's
+        # database connections
+        _executor = ProcessPoolExecutor(
+            max_workers=current_app.config['EXPORT_WORKERS'],
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return _executor
+
+
+def expire_stale_exports():
+    """Mark queued/running exports older than EXPORT_TIMEOUT_SECONDS as failed.
+
+    Their worker died (or the server restarted) before finishing; left
+    alone they would show as in progress, and be reused, forever.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config['EXPORT_TIMEOUT_SECONDS'])
+    expired = (
+        ExportJob.query
+        .filter(ExportJob.status.in_(('queued', 'running')), ExportJob.created_on < cutoff)
+        .update({
+            ExportJob.status: 'failed',
+            ExportJob.error: 'Timed out: the export did not finish.',
+            ExportJob.finished_on: datetime.utcnow(),
+        }, synchronize_session=False)
+    )
+    if expired:
+        db.session.commit()
+    return expired
+
+
+def find_fresh_export(job_id, file_format):
+    """Return a recent export with the same parameters, if any.
+
+    Queued and running exports are reused too, so repeated clicks on the
+    same export share one worker and one file, unless they have timed out.
+    """
+    expire_stale_exports()
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config['EXPORT_FRESHNESS_SECONDS'])
+    candidates = (
+        ExportJob.query
+        .filter(
+            ExportJob.job_id.is_(None) if job_id is None else ExportJob.job_id == job_id,
+            ExportJob.file_format == file_format,
+            ExportJob.status != 'failed',
+            db.or_(ExportJob.status != 'done', ExportJob.created_on >= cutoff)
+        )
+        .order_by(ExportJob.created_on.desc())
+    )
+    for export in candidates:
+        if export.status != 'done' or os.path.exists(os.path.join(export_folder(), export.filename)):
+            return export
+    return None
+
+
+def enqueue_export(job_id=None, file_format='xlsx', user_id=None):
+    """Queue an applicant export and return its ExportJob (possibly reused)."""
+    export = find_fresh_export(job_id, file_format)
+    if export is not None:
+        return export
+
+    export = ExportJob(job_id=job_id, file_format=file_format, requested_by=user_id)
+    db.session.add(export)
+    db.session.flush()
+    export.filename = export_filename(export)
+    db.session.commit()
+
+    _get_executor().submit(run_export, export.id)
+    return export
+
+
+def run_export(export_id):
+    """Worker entry point: build the export file for one ExportJob."""
+    from app import app
+
+    with app.app_context():
+        export = db.session.get(ExportJob, export_id)
+        if export is None or export.status != 'queued':
+            return
+        export.status = 'running'
+        db.session.commit()
+
+        path = os.path.join(export_folder(app), export.filename)
+        partial = path + '.part'
+        try:
+            count = 0
+
+            def counted(rows):
+                nonlocal count
+                for row in rows:
+                    count += 1
+                    yield row
+
+            rows = counted(applicant_rows(job_id=export.job_id))
+            headers = APPLICANT_HEADERS if export.job_id is not None else ALL_APPLICANT_HEADERS
+            with open(partial, 'wb') as f:
+                if export.file_format == 'csv':
+                    for chunk in iter_csv(headers, rows):
+                        f.write(chunk)
+                else:
+                    write_xlsx(f, "Applicants", headers, rows)
+            os.replace(partial, path)
+
+            export.status = 'done'
+            export.row_count = count
+        except Exception as exc:
+            db.session.rollback()
+            if os.path.exists(partial):
+                os.remove(partial)
+            export = db.session.get(ExportJob, export_id)
+            export.status = 'failed'
+            export.error = str(exc)
+        export.finished_on = datetime.utcnow()
+        db.session.commit()
@@ -0,0 +1,100 @@
+from sqlalchemy import String, case, cast, func, literal
+
+from counters import get_jobs_version
+from extensions import db
+from http_cache import VersionedResponseCache
+from models import Category, Job
+from search import FILTER_COLUMNS, filter_conditions, search_jobs
+
+# Lower bounds offered for the minimum-salary facet.
+SALARY_THRESHOLDS = (0, 10000, 25000, 50000, 100000)
+
+_facet_cache = VersionedResponseCache(maxsize=256)
+
+
+def _signature(query, filters):
+    parts = [f'q={query}']
+    for name in sorted(filters):
+        value = filters[name]
+        if isinstance(value, list):
+            value = ','.join(sorted(str(v) for v in value))
+        parts.append(f'{name}={value}')
+    return '&'.join(parts)
+
+
+def _salary_bucket():
+    # Highest threshold each job's min_salary reaches
+    return case(
+        *[(Job.min_salary >= t, str(t)) for t in reversed(SALARY_THRESHOLDS)],
+        else_=None
+    )
+
+
+def _facet_query(name, value_column, query, conditions):
+    """Counts per value of one facet, under every filter except its own.
+
+    Leaving out the facet's own filter keeps the alternatives visible with
+    their counts once one of them has been picked.
+    """
+    facet = (
+        db.session.query(
+            literal(name).label('facet'),
+            cast(value_column, String).label('value'),
+            func.count(Job.id).label('count')
+        )
+        .filter(*[cond for key, cond in conditions.items() if key != name])
+    )
+    if query:
+        facet, _ = search_jobs(facet, query)
+    return facet.filter(value_column.isnot(None)).group_by(value_column)
+
+
+def _compute_facets(query, filters):
+    conditions = filter_conditions(filters)
+    branches = [
+        _facet_query(name, column, query, conditions)
+        for name, column in FILTER_COLUMNS.items()
+    ]
+    branches.append(_facet_query('min_salary', _salary_bucket(), query, conditions))
+
+    # Every facet in one round trip: a UNION ALL of per-facet GROUP BYs
+    rows = branches[0].union_all(*branches[1:]).all()
+
+    facets = {name: {} for name in list(FILTER_COLUMNS) + ['min_salary']}
+    for name, value, count in rows:
+        facets[name][value] = count
+
+    category_names = dict(db.session.query(Category.id, Category.name).all())
+    result = {}
+    for name in FILTER_COLUMNS:
+        items = [{'value': value, 'count': count} for value, count in facets[name].items()]
+        if name == 'category_id':
+            for item in items:
+                item['value'] = int(item['value'])
+                item['label'] = category_names.get(item['value'], 'N/A')
+        items.sort(key=lambda item: (-item['count'], str(item['value'])))
+        result[name] = items
+
+    # Buckets hold jobs whose min_salary falls in [threshold, next); the
+    # facet offers "at least X", so accumulate from the top down.
+    salary, running = [], 0
+    for threshold in reversed(SALARY_THRESHOLDS):
+        running += facets['min_salary'].get(str(threshold), 0)
+        salary.append({'value': threshold, 'count': running})
+    result['min_salary'] = list(reversed(salary))
+    return result
+
+
+def job_facets(query, filters):
+    """Live filter values and match counts for the current search.
+
+    Results are cached per (query, filters) signature until the next job
+    insert, update or delete.
+    """
+    key = _signature(query, filters)
+    version = get_jobs_version()
+    facets = _facet_cache.get(key, version)
+    if facets is None:
+        facets = _compute_facets(query, filters)
+        _facet_cache.set(key, version, facets)
+    return facets
@@ -0,0 +1,105 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request
+
+
+class VersionedResponseCache:
+    """Small thread-safe LRU of cached values keyed by (key, version).
+
+    Entries for an old version are never served again once the version
+    moves on; they simply age out of the LRU.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            body = self._entries.get((key, version))
+            if body is not None:
+                self._entries.move_to_end((key, version))
+            return body
+
+    def set(self, key, version, body):
+        with self._lock:
+            self._entries[(key, version)] = body
+            self._entries.move_to_end((key, version))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def normalized_args():
+    """The query string as a canonical string: sorted keys, sorted values, blanks dropped."""
+    items = []
+    for key in sorted(request.args):
+        values = sorted(v for v in request.args.getlist(key) if v != '')
+        items.extend(f'{key}={value}' for value in values)
+    return '&'.join(items)
+
+
+def make_etag(version, key):
+    return hashlib.sha1(f'{version}:{key}'.encode()).hexdigest()
+
+
+def _gzipped(cache, key, version, body):
+    # compressed once per version, like the body itself
+    compressed = cache.get(f'{key}#gzip', version)
+    if compressed is None:
+        compressed = gzip.compress(body, compresslevel=6)
+        cache.set(f'{key}#gzip', version, compressed)
+    return compressed
+
+
+def conditional_json(get_version, cache, compress=False):
+    """Cache a JSON view by its query string and validate it with an ETag.
+
+    The ETag is derived from `get_version()` (a data version counter) and
+    the normalized query string, so a client holding a current copy gets a
+    304 without the view running at all, and other clients get the cached
+    body until the version changes.
+
+    With `compress`, bodies of GZIP_MIN_SIZE bytes or more are sent
+    gzip-encoded to clients that accept it, under their own ETag.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = get_version()
+            key = normalized_args()
+            etag = make_etag(version, key)
+            accepts_gzip = compress and request.accept_encodings['gzip'] > 0
+
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+            elif accepts_gzip and request.if_none_match.contains(f'{etag}-gzip'):
+                response = current_app.response_class(status=304)
+                etag = f'{etag}-gzip'
+            else:
+                body = cache.get(key, version)
+                if body is None:
+                    body = current_app.make_response(view(*args, **kwargs)).get_data()
+                    cache.set(key, version, body)
+                response = current_app.response_class(body, mimetype='application/json')
+                if accepts_gzip and len(body) >= current_app.config['GZIP_MIN_SIZE']:
+                    response.set_data(_gzipped(cache, key, version, body))
+                    response.content_encoding = 'gzip'
+                    etag = f'{etag}-gzip'
+
+            if compress:
+                response.vary.add('Accept-Encoding')
+            response.set_etag(etag)
+            # Clients may store the response but must revalidate each time
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
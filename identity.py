@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, g
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.session import make_transient_to_detached
+
+from extensions import db
+from models import Student, User
+
+# Identity cache for the Flask-Login user loader.
+#
+# The logged-in User and their Student profile are loaded together with
+# one join and their column values kept in a small per-process LRU for
+# IDENTITY_CACHE_TTL seconds. On a hit, `current_user` and
+# `current_user.student` are rebuilt from those values as detached
+# instances, without a query. They are kept out of the request's session:
+# a cached row may be stale, and routes that write load the Student
+# themselves, from the database.
+#
+# Any flushed change to a User or Student (profile edits, registration,
+# role changes, resume uploads) evicts that user's entry, in this process;
+# other workers see the change once their entry expires.
+
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize=1024, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = None
+
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = TTLCache(
+            maxsize=current_app.config['IDENTITY_CACHE_SIZE'],
+            ttl=current_app.config['IDENTITY_CACHE_TTL']
+        )
+    return _cache
+
+
+def _columns(obj):
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+
+def _detached(model, values):
+    """A detached instance of `model` built from cached column values."""
+    obj = model(**values)
+    make_transient_to_detached(obj)
+    return obj
+
+
+def load_user(user_id):
+    """Return the User with their Student profile attached, or None."""
+    memo = g.setdefault('_identities', {})
+    if user_id in memo:
+        return memo[user_id]
+
+    cache = _get_cache()
+    cached = cache.get(user_id)
+    if cached is not None:
+        user_values, student_values = cached
+        user = _detached(User, user_values)
+        student = _detached(Student, student_values) if student_values else None
+        if student is not None:
+            set_committed_value(student, 'user', user)
+    else:
+        row = (
+            db.session.query(User, Student)
+            .outerjoin(Student, Student.user_id == User.id)
+            .filter(User.id == user_id)
+            .first()
+        )
+        if row is None:
+            memo[user_id] = None
+            return None
+        user, student = row
+        cache.set(user_id, (_columns(user), _columns(student) if student else None))
+
+    set_committed_value(user, 'student', student)
+    memo[user_id] = user
+    return user
+
+
+def invalidate(user_id):
+    if _cache is not None:
+        _cache.discard(user_id)
+    memo = g.get('_identities') if g else None
+    if memo:
+        memo.pop(user_id, None)
+
+
+def _affected_users(session):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            yield obj.id
+        elif isinstance(obj, Student):
+            yield obj.user_id
+
+
+@event.listens_for(Session, 'after_flush')
+def _evict_changed_identities(session, flush_context):
+    user_ids = set(_affected_users(session))
+    if user_ids:
+        # again after commit, in case another request re-cached the old row meanwhile
+        session.info.setdefault('identity_evictions', set()).update(user_ids)
+        for user_id in user_ids:
+            invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _evict_after_commit(session):
+    for user_id in session.info.pop('identity_evictions', ()):
+        invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_evictions(session):
+    session.info.pop('identity_evictions', None)
@@ -0,0 +1,148 @@
+import json
+import time
+
+import click
+from flask import abort, current_app, jsonify
+from functools import lru_cache
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import undefer
+
+from extensions import db
+from facets import job_facets
+from models import Job
+from pagination import paginate
+from search import DEFAULT_SORT_KEYS, apply_job_filters, parse_job_filters, search_jobs
+
+try:
+    import orjson
+except ImportError:  # optional; the standard json module is used instead
+    orjson = None
+
+# The JSON job feed (/student/jobs/filter-json) selects only the columns
+# it returns and writes the row tuples straight out as JSON, instead of
+# loading whole Job objects (description included) and building each
+# dict through the ORM. Dates come back from the database already
+# formatted, so no datetime is parsed or strftime'd per row in Python.
+#
+# `?fields=title,company` narrows the response to those fields.
+
+
+def _day_string(column, dialect):
+    if dialect == 'sqlite':
+        return func.strftime('%Y-%m-%d', column)
+    return func.to_char(column, 'YYYY-MM-DD')
+
+
+@lru_cache(maxsize=None)
+def _columns(dialect):
+    return {
+        'id': Job.id,
+        'title': Job.title,
+        'company': Job.company,
+        'location': Job.location,
+        'type': Job.job_type,
+        'experience': Job.experience_level,
+        'salary': Job.min_salary,
+        'posted_on': _day_string(Job.posted_on, dialect),
+    }
+
+
+def feed_columns():
+    """Feed field name -> the column it is read from, in output order."""
+    return _columns(db.engine.dialect.name)
+
+
+def parse_fields(value, columns):
+    """The requested `fields=` names, in output order; all fields when blank."""
+    if not value:
+        return list(columns)
+    wanted = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = wanted - columns.keys()
+    if unknown:
+        abort(400, description=f"Unknown field(s): {', '.join(sorted(unknown))}.")
+    return [name for name in columns if name in wanted]
+
+
+def dumps(payload):
+    """Compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+
+def render_feed(args):
+    """JSON body of one feed page for the query string `args`."""
+    query = args.get('q', '').strip()
+    filters = parse_job_filters(args)
+    columns = feed_columns()
+    fields = parse_fields(args.get('fields', ''), columns)
+
+    # a Core select: rows come back as tuples, with no ORM bookkeeping
+    jobs_query = apply_job_filters(select(*[columns[name] for name in fields]), filters)
+    sort_keys = DEFAULT_SORT_KEYS
+    if query:
+        jobs_query, sort_keys = search_jobs(jobs_query, query)
+
+    page = paginate(jobs_query, sort_keys)
+    return dumps({
+        'jobs': [dict(zip(fields, row)) for row in page],
+        'next_cursor': page.next_cursor,
+        'facets': job_facets(query, filters),
+    })
+
+
+# ---------- Benchmark ----------
+
+def _render_orm_feed(args):
+    # The feed as it was built before: whole Job objects, one dict each
+    query = args.get('q', '').strip()
+    filters = parse_job_filters(args)
+    jobs_query = apply_job_filters(Job.query.options(undefer(Job.description)), filters)
+    sort_keys = DEFAULT_SORT_KEYS
+    if query:
+        jobs_query, sort_keys = search_jobs(jobs_query, query)
+    page = paginate(jobs_query, sort_keys)
+    return jsonify({
+        'jobs': [{
+            'id': job.id,
+            'title': job.title,
+            'company': job.company,
+            'location': job.location,
+            'type': job.job_type,
+            'experience': job.experience_level,
+            'salary': job.min_salary,
+            'posted_on': job.posted_on.strftime('%Y-%m-%d'),
+        } for job in page],
+        'next_cursor': page.next_cursor,
+        'facets': job_facets(query, filters),
+    }).get_data()
+
+
+@click.command('benchmark-job-feed')
+@click.option('--requests', 'count', default=300, show_default=True, help='Requests per scenario and variant.')
+def benchmark_job_feed_command(count):
+    """Compare requests/sec of the ORM and column-projected job feeds.
+
+    Bypasses the response cache, so every request runs its queries; the
+    facet counts are cached for both variants, as they are in production.
+    """
+    scenarios = {
+        'first page': '',
+        'first page, 100 rows': 'per_page=100',
+        'search': 'q=python',
+        'filtered, 100 rows': 'per_page=100&job_type=Full-time',
+        'fields=id,title': 'per_page=100&fields=id,title',
+    }
+    click.echo(f"{'':24}{'orm req/s':>11}{'projected req/s':>17}{'speedup':>9}{'bytes':>8}")
+    for label, query_string in scenarios.items():
+        rates = []
+        for render in (_render_orm_feed, render_feed):
+            with current_app.test_request_context(f'/student/jobs/filter-json?{query_string}') as ctx:
+                body = render(ctx.request.args)  # warm-up, and the facet cache
+                start = time.perf_counter()
+                for _ in range(count):
+                    render(ctx.request.args)
+                    db.session.remove()
+                rates.append(count / (time.perf_counter() - start))
+        click.echo(f'{label:24}{rates[0]:>11.0f}{rates[1]:>17.0f}{rates[1] / rates[0]:>8.1f}x{len(body):>8}')
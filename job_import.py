@@ -0,0 +1,197 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime
+
+from sqlalchemy import insert, select
+from werkzeug.datastructures import MultiDict
+
+import counters
+import job_similarity
+import rollups
+from admin.forms import JobForm
+from extensions import db
+from models import Category, Job, summarize
+
+# Rows sent to the database per executemany() call.
+IMPORT_CHUNK_SIZE = 500
+
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx', '.json')
+
+# Fields taken from each row, in JobForm terms. `category` is a category
+# name; it is resolved to `category_id` before validation.
+IMPORT_FIELDS = (
+    'title', 'company', 'location', 'category', 'tags', 'description',
+    'job_type', 'experience_level', 'min_salary', 'max_salary',
+)
+
+
+class ImportResult:
+    def __init__(self):
+        self.total = 0
+        self.inserted = 0
+        self.created_categories = []
+        self.errors = []  # (row number, [messages])
+        self.duplicates = []  # (row number, message); flagged, still imported
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def _normalize_header(name):
+    return str(name or '').strip().lower().replace(' ', '_')
+
+
+def read_rows(file_storage):
+    """Parse an uploaded CSV, XLSX or JSON file into a list of dicts."""
+    extension = os.path.splitext(file_storage.filename or '')[1].lower()
+    if extension not in SUPPORTED_EXTENSIONS:
+        raise ValueError('Upload a .csv, .xlsx or .json file.')
+
+    if extension == '.csv':
+        text = io.TextIOWrapper(file_storage.stream, encoding='utf-8-sig')
+        reader = csv.reader(text)
+        headers = [_normalize_header(h) for h in next(reader, [])]
+        rows = [dict(zip(headers, values)) for values in reader if any(values)]
+    elif extension == '.xlsx':
+        from openpyxl import load_workbook
+        wb = load_workbook(file_storage.stream, read_only=True, data_only=True)
+        values = wb.active.iter_rows(values_only=True)
+        headers = [_normalize_header(h) for h in next(values, ())]
+        rows = [dict(zip(headers, row)) for row in values if any(v not in (None, '') for v in row)]
+        wb.close()
+    else:
+        data = json.load(file_storage.stream)
+        if isinstance(data, dict):
+            data = data.get('jobs', [])
+        if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+            raise ValueError('JSON must be a list of job objects.')
+        rows = [{_normalize_header(k): v for k, v in row.items()} for row in data]
+    return rows
+
+
+def _clean(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def resolve_categories(names):
+    """Map category names to ids, creating the missing ones.
+
+    One SELECT for the names already present, one multi-row INSERT ...
+    RETURNING for the rest.
+    """
+    names = {name for name in names if name}
+    if not names:
+        return {}, []
+    existing = dict(db.session.execute(
+        select(Category.name, Category.id).where(Category.name.in_(names))
+    ).all())
+    missing = sorted(names - existing.keys())
+    if missing:
+        created = db.session.execute(
+            insert(Category).returning(Category.name, Category.id),
+            [{'name': name} for name in missing]
+        ).all()
+        existing.update(dict(created))
+    return existing, missing
+
+
+def validate_row(values, category_ids):
+    """Validate one row with JobForm; return (job dict, None) or (None, errors)."""
+    data = MultiDict()
+    for field in IMPORT_FIELDS:
+        value = _clean(values.get(field))
+        if field == 'category':
+            if value:
+                data['category_id'] = str(category_ids[value])
+        elif value:
+            # Blank optional fields are left out rather than sent empty,
+            # so IntegerField treats them as missing instead of invalid.
+            data[field] = value
+
+    form = JobForm(formdata=data, meta={'csrf': False})
+    form.category_id.choices = [(cid, name) for name, cid in category_ids.items()]
+    if not form.validate():
+        messages = [
+            f"{form[name].label.text}: {'; '.join(errors)}"
+            for name, errors in form.errors.items()
+        ]
+        return None, messages
+
+    return {
+        'title': form.title.data,
+        'company': form.company.data,
+        'location': form.location.data,
+        'category_id': form.category_id.data,
+        'tags': form.tags.data or None,
+        'description': form.description.data,
+        'job_type': form.job_type.data,
+        'experience_level': form.experience_level.data,
+        'min_salary': form.min_salary.data,
+        'max_salary': form.max_salary.data,
+    }, None
+
+
+def import_jobs(rows, dry_run=False):
+    """Validate and insert job rows; returns an ImportResult.
+
+    Valid rows are inserted with executemany() in IMPORT_CHUNK_SIZE
+    batches, all in one transaction; invalid rows are skipped and reported
+    with their spreadsheet row number (the header being row 1).
+    """
+    result = ImportResult()
+    result.total = len(rows)
+
+    category_ids, created = resolve_categories(_clean(row.get('category')) for row in rows)
+    result.created_categories = created
+
+    posted_on = datetime.utcnow()
+    jobs = []
+    numbers = []
+    for number, row in enumerate(rows, start=2):
+        job, errors = validate_row(row, category_ids)
+        if errors:
+            result.errors.append((number, errors))
+        else:
+            job['posted_on'] = posted_on
+            job['summary'] = summarize(job['description'])  # bulk inserts skip the model's validator
+            jobs.append(job)
+            numbers.append(number)
+
+    for i, job_id, other, score in job_similarity.find_near_duplicates(jobs):
+        match = f'job #{job_id}' if job_id is not None else f'row {numbers[other]}'
+        result.duplicates.append((numbers[i], f'{score:.0%} similar to {match}'))
+
+    if dry_run:
+        db.session.rollback()
+        return result
+
+    # Bulk inserts skip the session's flush hooks, so maintain the
+    # counters and rollups here, in the same transaction. The jobs version
+    # goes first, so the rows can be stamped with it (see matching.py).
+    if jobs:
+        version = counters.bump_jobs_version(db.session.connection())
+        for job in jobs:
+            job['changed_version'] = version
+
+    for start in range(0, len(jobs), IMPORT_CHUNK_SIZE):
+        db.session.execute(insert(Job), jobs[start:start + IMPORT_CHUNK_SIZE])
+
+    if jobs:
+        connection = db.session.connection()
+        counters.bump(connection, 'jobs', len(jobs))
+        rollups.record(connection, [
+            (posted_on.date(), rollups.JOBS_POSTED, job['category_id']) for job in jobs
+        ])
+    db.session.commit()
+    result.inserted = len(jobs)
+
+    if jobs:
+        job_similarity.index_unindexed()
+    return result
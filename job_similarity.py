@@ -0,0 +1,237 @@
+import hashlib
+import zlib
+
+import click
+import numpy as np
+from sqlalchemy import and_, delete, func, insert, or_
+
+from extensions import db
+from matching import tokenize
+from models import Job, JobBand, JobSignature
+
+# Similar jobs via MinHash and locality-sensitive hashing.
+#
+# Each job is reduced to a set of shingles (title and tag terms, and word
+# pairs from the description) and summarised by a MinHash signature of
+# NUM_PERM values; the fraction of positions two signatures agree on
+# estimates the Jaccard similarity of their shingle sets. The signature is
+# cut into BANDS bands, each hashed to a bucket, and jobs sharing any
+# bucket are candidates. Lookups read a job's BANDS buckets from the
+# (band, bucket) primary key, so their cost depends on how many jobs are
+# similar, not on how many jobs there are.
+#
+# With 32 bands of 4 rows, pairs above roughly 0.5 similarity are almost
+# always candidates and pairs below 0.2 rarely are.
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+
+# Estimated similarity at which an imported job is flagged as a possible
+# duplicate, and below which a job is not shown as similar.
+DUPLICATE_THRESHOLD = 0.8
+SIMILAR_THRESHOLD = 0.2
+
+# Most candidates re-scored per lookup.
+MAX_CANDIDATES = 50
+
+_PRIME = (1 << 31) - 1
+
+# Fixed seed: signatures are stored, so every process must use the same
+# hash functions.
+_rng = np.random.RandomState(20240601)
+_A = _rng.randint(1, _PRIME, NUM_PERM).astype(np.int64)
+_B = _rng.randint(0, _PRIME, NUM_PERM).astype(np.int64)
+
+
+def shingles(title, tags, description):
+    words = tokenize(description)
+    result = {f'{a} {b}' for a, b in zip(words, words[1:])} or set(words)
+    result.update(f't:{term}' for term in tokenize(title))
+    result.update(f'g:{term}' for term in tokenize((tags or '').replace(',', ' ')))
+    return result
+
+
+def signature(title, tags, description):
+    """MinHash signature of a job's text as an int64 array."""
+    items = shingles(title, tags, description)
+    if not items:
+        return np.full(NUM_PERM, _PRIME, np.int64)
+    hashes = np.fromiter((zlib.crc32(s.encode()) for s in items), np.int64, count=len(items)) % _PRIME
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME).min(axis=1)
+
+
+def band_buckets(sig):
+    """(band, bucket) pairs for a signature."""
+    return [
+        (band, int.from_bytes(
+            hashlib.blake2b(sig[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).digest(),
+            'big', signed=True
+        ))
+        for band in range(BANDS)
+    ]
+
+
+def _pack(sig):
+    return sig.astype('<u4').tobytes()
+
+
+def _unpack(data):
+    return np.frombuffer(data, '<u4').astype(np.int64)
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+# ---------- Index maintenance ----------
+
+def index_jobs(jobs):
+    """Add or replace index entries for `(id, title, tags, description)` rows.
+
+    Runs in the caller's transaction; the caller commits.
+    """
+    signatures = []
+    bands = []
+    for job_id, title, tags, description in jobs:
+        sig = signature(title, tags, description)
+        signatures.append({'job_id': job_id, 'signature': _pack(sig)})
+        bands.extend({'band': band, 'bucket': bucket, 'job_id': job_id} for band, bucket in band_buckets(sig))
+    if not signatures:
+        return
+    job_ids = [row['job_id'] for row in signatures]
+    remove_jobs(job_ids)
+    db.session.execute(insert(JobSignature), signatures)
+    db.session.execute(insert(JobBand), bands)
+
+
+def index_job(job):
+    """Index one Job object (flushed, so it has an id)."""
+    index_jobs([(job.id, job.title, job.tags, job.description)])
+
+
+def remove_jobs(job_ids):
+    db.session.execute(delete(JobBand).where(JobBand.job_id.in_(job_ids)))
+    db.session.execute(delete(JobSignature).where(JobSignature.job_id.in_(job_ids)))
+
+
+def index_unindexed(batch_size=1000):
+    """Index every job without a signature, committing per batch; return the count."""
+    indexed = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.session.query(Job.id, Job.title, Job.tags, Job.description)
+            .outerjoin(JobSignature, JobSignature.job_id == Job.id)
+            .filter(JobSignature.job_id.is_(None), Job.id > last_id)
+            .order_by(Job.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return indexed
+        index_jobs(rows)
+        db.session.commit()
+        indexed += len(rows)
+        last_id = rows[-1].id
+
+
+def rebuild():
+    """Drop and rebuild the whole index; return the number of jobs indexed."""
+    db.session.execute(delete(JobBand))
+    db.session.execute(delete(JobSignature))
+    db.session.commit()
+    return index_unindexed()
+
+
+# ---------- Lookups ----------
+
+def _candidates(buckets, exclude_id=None):
+    """Ids of indexed jobs sharing a bucket with `buckets`, most shared first."""
+    query = db.session.query(JobBand.job_id).filter(
+        or_(*[and_(JobBand.band == band, JobBand.bucket == bucket) for band, bucket in buckets])
+    )
+    if exclude_id is not None:
+        query = query.filter(JobBand.job_id != exclude_id)
+    query = query.group_by(JobBand.job_id).order_by(func.count().desc()).limit(MAX_CANDIDATES)
+    return [job_id for (job_id,) in query]
+
+
+def _scored(sig, candidate_ids, threshold):
+    """(job id, similarity) of candidates at or above `threshold`, best first."""
+    if not candidate_ids:
+        return []
+    rows = db.session.query(JobSignature.job_id, JobSignature.signature).filter(
+        JobSignature.job_id.in_(candidate_ids)
+    )
+    scored = [(job_id, similarity(sig, _unpack(data))) for job_id, data in rows]
+    return sorted((item for item in scored if item[1] >= threshold), key=lambda item: item[1], reverse=True)
+
+
+def similar_jobs(job_id, limit=5):
+    """Jobs most similar to `job_id` as (job, similarity) pairs, best first."""
+    data = db.session.query(JobSignature.signature).filter_by(job_id=job_id).scalar()
+    if data is None:
+        return []  # not indexed yet
+    sig = _unpack(data)
+    scored = _scored(sig, _candidates(band_buckets(sig), exclude_id=job_id), SIMILAR_THRESHOLD)[:limit]
+    jobs = {job.id: job for job in Job.query.filter(Job.id.in_([job_id for job_id, _ in scored]))}
+    return [(jobs[job_id], score) for job_id, score in scored if job_id in jobs]
+
+
+def _chunks(values, size=500):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def find_near_duplicates(jobs, threshold=DUPLICATE_THRESHOLD):
+    """Flag jobs (dicts with title, tags, description) that look already posted.
+
+    Each job is compared with the indexed jobs and with the earlier jobs in
+    `jobs`. Returns `(index, job_id, other_index, similarity)` tuples, with
+    either `job_id` (an existing job) or `other_index` (an earlier entry of
+    `jobs`) set. The index is read with a few bulk queries for the whole
+    batch rather than per job.
+    """
+    signatures = [signature(job.get('title'), job.get('tags'), job.get('description')) for job in jobs]
+    buckets = [band_buckets(sig) for sig in signatures]
+
+    wanted = {bucket for row in buckets for bucket in row}
+    indexed = {}  # (band, bucket) -> existing job ids
+    for chunk in _chunks({bucket for _, bucket in wanted}):
+        rows = db.session.query(JobBand.band, JobBand.bucket, JobBand.job_id).filter(JobBand.bucket.in_(chunk))
+        for band, bucket, job_id in rows:
+            if (band, bucket) in wanted:
+                indexed.setdefault((band, bucket), set()).add(job_id)
+
+    existing = {}
+    for chunk in _chunks({job_id for ids in indexed.values() for job_id in ids}):
+        rows = db.session.query(JobSignature.job_id, JobSignature.signature).filter(JobSignature.job_id.in_(chunk))
+        existing.update((job_id, _unpack(data)) for job_id, data in rows)
+
+    found = []
+    earlier = {}  # (band, bucket) -> indexes of earlier entries
+    for i, (sig, row) in enumerate(zip(signatures, buckets)):
+        best = None
+        for job_id in {job_id for bucket in row for job_id in indexed.get(bucket, ())} & existing.keys():
+            score = similarity(sig, existing[job_id])
+            if score >= threshold and (best is None or score > best[3]):
+                best = (i, job_id, None, score)
+        for j in {j for bucket in row for j in earlier.get(bucket, ())}:
+            score = similarity(sig, signatures[j])
+            if score >= threshold and (best is None or score > best[3]):
+                best = (i, None, j, score)
+        if best is not None:
+            found.append(best)
+        for bucket in row:
+            earlier.setdefault(bucket, []).append(i)
+    return found
+
+
+@click.command('build-similarity-index')
+@click.option('--full', is_flag=True, help='Rebuild from scratch instead of indexing only new jobs.')
+def build_similarity_index_command(full):
+    """Build the MinHash/LSH index behind similar jobs and duplicate checks."""
+    count = rebuild() if full else index_unindexed()
+    click.echo(f'Indexed {count} jobs.')
@@ -1,19 +1,18 @@
 from flask import Blueprint, render_template, redirect, url_for
 from models import Job, Application, Student, Category
+from counters import get_counts
 
 main_bp = Blueprint('main', __name__)
 
 @main_bp.route("/")
 def home():
-    # Fetch data to be displayed on the homepage
-    job_count = Job.query.count()
-    student_count = Student.query.count()
-    application_count = Application.query.count()
+    # Precomputed counters, maintained on insert/delete (see counters.py)
+    counts = get_counts()
 
     return render_template("index.html", 
-                           job_count=job_count,
-                           student_count=student_count,
-                           application_count=application_count)
+                           job_count=counts['jobs'],
+                           student_count=counts['students'],
+                           application_count=counts['applications'])
 @main_bp.route("/blog")
 def blog():
     return render_template("blog.html")
@@ -0,0 +1,281 @@
+import re
+import threading
+import zlib
+from collections import Counter, OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+from counters import get_jobs_version
+from extensions import db
+from models import Job, ResumeFile
+
+# Candidate-job matching with hashed TF-IDF vectors.
+#
+# Every document (a job's title, tags and description; a student's
+# experience and resume text) becomes a sparse vector of term counts in a
+# fixed 2**18-dimensional space, each term hashed to its slot, so there is
+# no vocabulary to build or keep in sync. Terms are weighted by 1 + log(tf)
+# and by an IDF computed over all jobs, and candidates are ranked by cosine
+# similarity, blended with their CGPA. Scoring is a handful of NumPy
+# operations over the concatenated term arrays of all candidates at once.
+#
+# Vectors are cached per process. When the jobs version counter moves, job
+# vectors are refreshed from the rows that changed since the last refresh
+# (stamped with the version, see counters.py), the ids no longer present
+# and the ids not seen before, and the IDF is adjusted for just those;
+# student vectors are keyed by their experience text and resume hash, so
+# an edited profile or a new upload is picked up on the next ranking.
+DIMENSIONS = 1 << 18
+
+# New job ids fetched per query, under SQLite's bound parameter limit.
+FETCH_CHUNK_SIZE = 500
+
+# Share of the final score that comes from CGPA (scaled from 0-10 to 0-1).
+CGPA_WEIGHT = 0.15
+
+# Job fields counted more than once, so a tag or title hit outweighs a
+# passing mention in the description.
+TITLE_WEIGHT = 3
+TAG_WEIGHT = 3
+
+# Keeps terms like c++, c# and node.js whole.
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#.]*')
+
+STOP_WORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or our that the '
+    'their this to we will with you your'.split()
+)
+
+
+def tokenize(value):
+    """Lower-cased terms of `value`, without stop words."""
+    terms = (t.rstrip('.') for t in _TOKEN_RE.findall((value or '').lower()))
+    return [t for t in terms if t not in STOP_WORDS]
+
+
+@lru_cache(maxsize=65536)
+def _slot(term):
+    return zlib.crc32(term.encode()) & (DIMENSIONS - 1)
+
+
+def term_counts(*weighted_texts):
+    """Hashed term counts of `(text, weight)` pairs: (indices, counts) arrays."""
+    terms = Counter()
+    for value, weight in weighted_texts:
+        for term, count in Counter(_TOKEN_RE.findall((value or '').lower())).items():
+            # counted before filtering: far fewer distinct terms than tokens
+            term = term.rstrip('.')
+            if term not in STOP_WORDS:
+                terms[term] += count * weight
+    if not terms:
+        return np.empty(0, np.int32), np.empty(0, np.float32)
+    slots = np.fromiter((_slot(t) for t in terms), np.int32, count=len(terms))
+    # distinct terms can share a slot; sum their counts
+    indices, inverse = np.unique(slots, return_inverse=True)
+    counts = np.bincount(inverse, weights=np.fromiter(terms.values(), np.float64, count=len(terms)))
+    return indices, counts.astype(np.float32)
+
+
+def merge_vectors(*vectors):
+    """Sum sparse count vectors."""
+    indices = np.concatenate([v[0] for v in vectors])
+    counts = np.concatenate([v[1] for v in vectors])
+    merged, inverse = np.unique(indices, return_inverse=True)
+    return merged, np.bincount(inverse, weights=counts).astype(np.float32)
+
+
+class SparseRows:
+    """Sparse count vectors flattened once, to score many queries against.
+
+    The rows' term arrays are concatenated, TF-IDF weighted and their norms
+    computed up front; scoring a query is then a gather and a bincount
+    over all their terms, whatever the row count.
+    """
+
+    def __init__(self, rows, idf):
+        self.idf = idf
+        self.count = n = len(rows)
+        lengths = np.fromiter((len(r[0]) for r in rows), np.int64, count=n)
+        if n and lengths.sum():
+            self.indices = np.concatenate([r[0] for r in rows])
+            counts = np.concatenate([r[1] for r in rows])
+        else:
+            self.indices = np.empty(0, np.int32)
+            counts = np.empty(0, np.float32)
+        self.row_ids = np.repeat(np.arange(n), lengths)
+        self.weights = (1 + np.log(counts)) * idf[self.indices]
+        self.norms = np.sqrt(np.bincount(self.row_ids, weights=self.weights * self.weights, minlength=n))
+
+    def cosine(self, query):
+        """Cosine similarity of the (indices, counts) `query` to every row."""
+        q_indices, q_counts = query
+        q_weights = (1 + np.log(q_counts)) * self.idf[q_indices]
+        q_norm = np.sqrt(np.dot(q_weights, q_weights))
+        if self.count == 0 or q_norm == 0:
+            return np.zeros(self.count, np.float32)
+        dense = np.zeros(DIMENSIONS, np.float32)
+        dense[q_indices] = q_weights / q_norm
+        dots = np.bincount(self.row_ids, weights=self.weights * dense[self.indices], minlength=self.count)
+        return np.divide(dots, self.norms, out=np.zeros(self.count), where=self.norms > 0).astype(np.float32)
+
+
+def cosine_scores(query, rows, idf):
+    """Cosine similarity of one sparse vector against each of `rows`."""
+    return SparseRows(rows, idf).cosine(query)
+
+
+def top_k(scores, k):
+    """Positions of the `k` highest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, np.int64)
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part], kind='stable')]
+
+
+class MatchIndex:
+    """Per-process cache of job and candidate vectors."""
+
+    def __init__(self, max_students=50000):
+        self.max_students = max_students
+        self._lock = threading.Lock()
+        self._jobs_version = None
+        self._jobs = {}  # job id -> (fingerprint, (indices, counts))
+        self._df = None  # jobs containing each slot
+        self._idf = None
+        self._resumes = OrderedDict()  # sha256 -> (indices, counts)
+        self._students = OrderedDict()  # student id -> (fingerprint, (indices, counts))
+
+    # -- jobs --
+
+    def _changed_job_rows(self):
+        """Text of the jobs added or edited since the last refresh; drops deleted ones."""
+        query = db.session.query(Job.id, Job.title, Job.tags, Job.description)
+        if self._jobs_version is None:
+            return query.all()
+        ids = {job_id for job_id, in db.session.query(Job.id)}
+        for job_id in self._jobs.keys() - ids:
+            self._df[self._jobs.pop(job_id)[1][0]] -= 1
+        # and rows never stamped (older ones, benchmark data) by their new id
+        rows = query.filter(Job.changed_version > self._jobs_version).all()
+        new_ids = sorted(ids - self._jobs.keys() - {row.id for row in rows})
+        for start in range(0, len(new_ids), FETCH_CHUNK_SIZE):
+            rows += query.filter(Job.id.in_(new_ids[start:start + FETCH_CHUNK_SIZE])).all()
+        return rows
+
+    def _refresh_jobs(self, force=False):
+        version = get_jobs_version()
+        if version == self._jobs_version and not force:
+            return
+        if self._jobs_version is None:
+            self._jobs = {}
+            self._df = np.zeros(DIMENSIONS, np.float32)
+        for job_id, title, tags, description in self._changed_job_rows():
+            fingerprint = hash((title, tags, description))
+            cached = self._jobs.get(job_id)
+            if cached is not None and cached[0] == fingerprint:
+                continue
+            if cached is not None:
+                self._df[cached[1][0]] -= 1
+            vector = term_counts(
+                (title, TITLE_WEIGHT), (tags and tags.replace(',', ' '), TAG_WEIGHT), (description, 1)
+            )
+            self._df[vector[0]] += 1
+            self._jobs[job_id] = (fingerprint, vector)
+
+        self._idf = (np.log((1 + len(self._jobs)) / (1 + self._df)) + 1).astype(np.float32)
+        self._jobs_version = version
+
+    def job_vectors(self):
+        """(job ids, vectors, idf) for every job, refreshed if jobs changed."""
+        with self._lock:
+            self._refresh_jobs()
+            ids = list(self._jobs)
+            return ids, [self._jobs[i][1] for i in ids], self._idf
+
+    def job_vector(self, job_id):
+        with self._lock:
+            self._refresh_jobs()
+            if job_id not in self._jobs:
+                # created in a transaction that has not bumped the version yet
+                self._refresh_jobs(force=True)
+            return self._jobs[job_id][1], self._idf
+
+    # -- students --
+
+    def _load_resumes(self, hashes):
+        missing = [h for h in hashes if h and h not in self._resumes]
+        if missing:
+            texts = db.session.query(ResumeFile.sha256, ResumeFile.text).filter(
+                ResumeFile.sha256.in_(missing),
+                ResumeFile.text.isnot(None)
+            )
+            for sha256, text in texts:
+                self._resumes[sha256] = term_counts((text, 1))
+        for h in hashes:
+            if h in self._resumes:
+                self._resumes.move_to_end(h)
+        while len(self._resumes) > self.max_students:
+            self._resumes.popitem(last=False)
+
+    def student_vectors(self, students):
+        """Vectors for `students` (objects with id, experience and resume_sha256)."""
+        with self._lock:
+            self._load_resumes({s.resume_sha256 for s in students})
+            vectors = []
+            for student in students:
+                # A resume still waiting for extraction is keyed as absent,
+                # so its text is picked up once it arrives.
+                sha256 = student.resume_sha256 if student.resume_sha256 in self._resumes else None
+                fingerprint = (hash(student.experience), sha256)
+                cached = self._students.get(student.id)
+                if cached is None or cached[0] != fingerprint:
+                    vector = term_counts((student.experience, 1))
+                    if sha256:
+                        vector = merge_vectors(vector, self._resumes[sha256])
+                    cached = (fingerprint, vector)
+                    self._students[student.id] = cached
+                self._students.move_to_end(student.id)
+                vectors.append(cached[1])
+            while len(self._students) > self.max_students:
+                self._students.popitem(last=False)
+            return vectors
+
+    def clear(self):
+        with self._lock:
+            self._jobs_version = None
+            self._jobs = {}
+            self._df = None
+            self._idf = None
+            self._resumes.clear()
+            self._students.clear()
+
+
+match_index = MatchIndex()
+
+
+def cgpa_scores(students):
+    cgpa = np.array([s.cgpa if s.cgpa is not None else 0.0 for s in students], np.float32)
+    return np.clip(cgpa / 10.0, 0.0, 1.0)
+
+
+def score_students(job_id, students):
+    """Match scores (0-1) of `students` for a job, in input order."""
+    query, idf = match_index.job_vector(job_id)
+    similarity = cosine_scores(query, match_index.student_vectors(students), idf)
+    return (1 - CGPA_WEIGHT) * similarity + CGPA_WEIGHT * cgpa_scores(students)
+
+
+def rank_applications(job_id, applications, k=None):
+    """Rank a job's applications by their student's match score.
+
+    Returns `(ranked, scores)`: the top `k` (all when None) as
+    `(application, score)` pairs, best first, and a dict of every
+    application id to its score.
+    """
+    applications = list(applications)
+    scores = score_students(job_id, [a.student for a in applications])
+    order = top_k(scores, len(applications) if k is None else k)
+    ranked = [(applications[i], float(scores[i])) for i in order]
+    return ranked, {a.id: float(s) for a, s in zip(applications, scores)}
@@ -0,0 +1,259 @@
+import hmac
+import threading
+import time
+from bisect import bisect_left
+
+from flask import before_render_template, current_app, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+
+from extensions import db
+
+# Per-endpoint request metrics, in Prometheus text format at /admin/metrics.
+#
+# Each request keeps its own running totals on `g`: SQL statements and
+# the time spent in the driver (from the engine's cursor events), and
+# template render time (from Flask's render signals). Those need no
+# locking; only when the request ends are they folded into the process
+# aggregates, under one lock, together with the request's latency. A
+# request therefore costs one lock acquisition however many queries it
+# runs.
+#
+# The aggregates live in the process: each worker reports its own, and
+# they start again from zero when it restarts. Prometheus copes with both
+# (scrape every worker, or accept the per-worker view; rate() absorbs
+# resets).
+#
+# Statements run outside a request (background exports, CLI commands)
+# are counted under the endpoint "(background)".
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BACKGROUND = '(background)'
+UNMATCHED = '(unmatched)'  # 404s and other requests no route matched
+
+
+class _Endpoint:
+    __slots__ = ('buckets', 'latency_sum', 'statuses', 'statements', 'db_seconds', 'renders', 'render_seconds')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # the last one is +Inf
+        self.latency_sum = 0.0
+        self.statuses = {}  # (method, status) -> count
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.renders = 0
+        self.render_seconds = 0.0
+
+
+class MetricsRegistry:
+    """Thread-safe per-endpoint aggregates."""
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, name):
+        endpoint = self._endpoints.get(name)
+        if endpoint is None:
+            endpoint = self._endpoints[name] = _Endpoint()
+        return endpoint
+
+    def record_request(self, name, method, status, seconds, state):
+        bucket = bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            endpoint = self._endpoint(name)
+            endpoint.buckets[bucket] += 1
+            endpoint.latency_sum += seconds
+            key = (method, status)
+            endpoint.statuses[key] = endpoint.statuses.get(key, 0) + 1
+            endpoint.statements += state.statements
+            endpoint.db_seconds += state.db_seconds
+            endpoint.renders += state.renders
+            endpoint.render_seconds += state.render_seconds
+
+    def record_statement(self, name, seconds):
+        with self._lock:
+            endpoint = self._endpoint(name)
+            endpoint.statements += 1
+            endpoint.db_seconds += seconds
+
+    def snapshot(self):
+        """{endpoint: copy of its aggregates}, taken under the lock."""
+        with self._lock:
+            copies = {}
+            for name, endpoint in self._endpoints.items():
+                copy = _Endpoint()
+                for field in _Endpoint.__slots__:
+                    value = getattr(endpoint, field)
+                    setattr(copy, field, value.copy() if isinstance(value, (list, dict)) else value)
+                copies[name] = copy
+            return copies
+
+    def clear(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+registry = MetricsRegistry()
+
+
+class _RequestState:
+    __slots__ = ('started', 'statements', 'db_seconds', 'renders', 'render_seconds', 'render_started', 'status')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.renders = 0
+        self.render_seconds = 0.0
+        self.render_started = []  # a stack: render_template can be called while rendering
+        self.status = None
+
+
+def _request_state():
+    return g.get('_metrics') if has_request_context() else None
+
+
+# ---------- Hooks ----------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_metrics_started', None)
+    if started is None:
+        return
+    seconds = time.perf_counter() - started
+    state = _request_state()
+    if state is None:
+        registry.record_statement(BACKGROUND, seconds)
+    else:
+        state.statements += 1
+        state.db_seconds += seconds
+
+
+def _before_render(sender, template, context, **extra):
+    state = _request_state()
+    if state is not None:
+        state.render_started.append(time.perf_counter())
+
+
+def _rendered(sender, template, context, **extra):
+    state = _request_state()
+    if state is not None and state.render_started:
+        state.renders += 1
+        state.render_seconds += time.perf_counter() - state.render_started.pop()
+
+
+def _start_request():
+    g._metrics = _RequestState()
+
+
+def _note_status(response):
+    state = g.get('_metrics')
+    if state is not None:
+        state.status = response.status_code
+    return response
+
+
+def _finish_request(exc):
+    state = g.pop('_metrics', None)
+    if state is None:
+        return
+    # an unhandled exception never reaches after_request: it is a 500
+    status = state.status if exc is None and state.status is not None else 500
+    registry.record_request(request.endpoint or UNMATCHED, request.method, status,
+                            time.perf_counter() - state.started, state)
+
+
+def init_app(app):
+    """Install the request, template and SQL hooks; call after db.init_app."""
+    if not app.config['METRICS_ENABLED']:
+        return
+    # registered ahead of any other before_request hook, so their time counts
+    # too; install it after profiling.init_app, which also goes first in line
+    app.before_request_funcs.setdefault(None, []).insert(0, _start_request)
+    app.after_request(_note_status)
+    app.teardown_request(_finish_request)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_rendered, app)
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+# ---------- Exposition ----------
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_metrics():
+    """The aggregates in the Prometheus text exposition format."""
+    endpoints = sorted(registry.snapshot().items())
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    family('http_requests_total', 'counter', 'Requests handled, by endpoint, method and status.')
+    for name, endpoint in endpoints:
+        for (method, status), count in sorted(endpoint.statuses.items()):
+            lines.append(f'http_requests_total{{endpoint="{_label(name)}",method="{method}",status="{status}"}} {count}')
+
+    family('http_request_duration_seconds', 'histogram', 'Request latency, by endpoint.')
+    for name, endpoint in endpoints:
+        total = sum(endpoint.buckets)
+        if not total:
+            continue
+        label = _label(name)
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, endpoint.buckets):
+            cumulative += count
+            lines.append(f'http_request_duration_seconds_bucket{{endpoint="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'http_request_duration_seconds_bucket{{endpoint="{label}",le="+Inf"}} {total}')
+        lines.append(f'http_request_duration_seconds_sum{{endpoint="{label}"}} {_number(endpoint.latency_sum)}')
+        lines.append(f'http_request_duration_seconds_count{{endpoint="{label}"}} {total}')
+
+    family('db_statements_total', 'counter', 'SQL statements executed, by endpoint.')
+    for name, endpoint in endpoints:
+        lines.append(f'db_statements_total{{endpoint="{_label(name)}"}} {endpoint.statements}')
+
+    family('db_duration_seconds_total', 'counter', 'Time spent executing SQL statements, by endpoint.')
+    for name, endpoint in endpoints:
+        lines.append(f'db_duration_seconds_total{{endpoint="{_label(name)}"}} {_number(endpoint.db_seconds)}')
+
+    family('template_renders_total', 'counter', 'render_template calls, by endpoint.')
+    for name, endpoint in endpoints:
+        if endpoint.renders:
+            lines.append(f'template_renders_total{{endpoint="{_label(name)}"}} {endpoint.renders}')
+
+    family('template_render_duration_seconds_total', 'counter', 'Time spent rendering templates, by endpoint.')
+    for name, endpoint in endpoints:
+        if endpoint.renders:
+            lines.append(f'template_render_duration_seconds_total{{endpoint="{_label(name)}"}} '
+                         f'{_number(endpoint.render_seconds)}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def scrape_token_matches():
+    """True if the request carries `Authorization: Bearer <METRICS_TOKEN>`.
+
+    Lets a Prometheus server scrape without an admin login session.
+    """
+    token = current_app.config['METRICS_TOKEN']
+    header = request.headers.get('Authorization', '')
+    if not token or not header.startswith('Bearer '):
+        return False
+    return hmac.compare_digest(header[len('Bearer '):].encode(), token.encode())
@@ -0,0 +1,76 @@
+"""Add resume text and candidate search index
+
+Revision ID: 3c8a2e9f4d71
+Revises: 7d3e5f1a0b96
+Create Date: 2026-10-18 16:05:12.402318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c8a2e9f4d71'
+down_revision = '7d3e5f1a0b96'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = 'name, experience, resume'
+RESUME_TEXT = 'SELECT text FROM resume_file WHERE sha256 = new.resume_sha256'
+
+
+def upgrade():
+    with op.batch_alter_table('resume_file', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('text', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('text_extracted_on', sa.DateTime(), nullable=True))
+
+    # FTS5 is SQLite-only; other backends keep using the ILIKE fallback in resume_search.py.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE student_fts USING fts5("
+        f"{COLUMNS}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    op.execute(
+        "CREATE TRIGGER student_fts_ai AFTER INSERT ON student BEGIN "
+        f"INSERT INTO student_fts(rowid, {COLUMNS}) "
+        f"VALUES (new.id, new.name, new.experience, ({RESUME_TEXT})); END"
+    )
+    op.execute(
+        "CREATE TRIGGER student_fts_ad AFTER DELETE ON student BEGIN "
+        "DELETE FROM student_fts WHERE rowid = old.id; END"
+    )
+    op.execute(
+        "CREATE TRIGGER student_fts_au AFTER UPDATE OF name, experience, resume_sha256 ON student BEGIN "
+        "DELETE FROM student_fts WHERE rowid = old.id; "
+        f"INSERT INTO student_fts(rowid, {COLUMNS}) "
+        f"VALUES (new.id, new.name, new.experience, ({RESUME_TEXT})); END"
+    )
+    op.execute(
+        "CREATE TRIGGER student_fts_resume_au AFTER UPDATE OF text ON resume_file BEGIN "
+        "DELETE FROM student_fts WHERE rowid IN (SELECT id FROM student WHERE resume_sha256 = new.sha256); "
+        f"INSERT INTO student_fts(rowid, {COLUMNS}) "
+        "SELECT id, name, experience, new.text FROM student WHERE resume_sha256 = new.sha256; END"
+    )
+    # Index the students that already exist; resume text follows once
+    # `flask extract-resumes` has run.
+    op.execute(
+        f"INSERT INTO student_fts(rowid, {COLUMNS}) "
+        "SELECT student.id, student.name, student.experience, resume_file.text "
+        "FROM student LEFT JOIN resume_file ON resume_file.sha256 = student.resume_sha256"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS student_fts_resume_au")
+        op.execute("DROP TRIGGER IF EXISTS student_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS student_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS student_fts_ai")
+        op.execute("DROP TABLE IF EXISTS student_fts")
+
+    with op.batch_alter_table('resume_file', schema=None) as batch_op:
+        batch_op.drop_column('text_extracted_on')
+        batch_op.drop_column('text')
@@ -0,0 +1,34 @@
+"""Widen user password column
+
+Revision ID: 4b9d2f7e1c60
+Revises: 6a1f3d8e5c02
+Create Date: 2026-10-18 19:40:12.503817
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b9d2f7e1c60'
+down_revision = '6a1f3d8e5c02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # werkzeug's default scrypt hashes are 162 characters; SQLite never
+    # enforced the old length, PostgreSQL rejects them
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.alter_column('password',
+               existing_type=sa.String(length=128),
+               type_=sa.String(length=255),
+               existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.alter_column('password',
+               existing_type=sa.String(length=255),
+               type_=sa.String(length=128),
+               existing_nullable=False)
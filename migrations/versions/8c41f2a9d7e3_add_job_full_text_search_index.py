@@ -0,0 +1,58 @@
+"""Add job full-text search index
+
+Revision ID: 8c41f2a9d7e3
+Revises: 249d6067b120
+Create Date: 2026-10-18 10:12:40.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c41f2a9d7e3'
+down_revision = '249d6067b120'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = 'title, company, location, tags, description'
+NEW_VALUES = 'new.title, new.company, new.location, new.tags, new.description'
+OLD_VALUES = 'old.title, old.company, old.location, old.tags, old.description'
+
+
+def upgrade():
+    # FTS5 is SQLite-only; other backends keep using the ILIKE fallback in search.py.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE job_fts USING fts5("
+        f"{COLUMNS}, content='job', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    op.execute(
+        "CREATE TRIGGER job_fts_ai AFTER INSERT ON job BEGIN "
+        f"INSERT INTO job_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER job_fts_ad AFTER DELETE ON job BEGIN "
+        f"INSERT INTO job_fts(job_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER job_fts_au AFTER UPDATE ON job BEGIN "
+        f"INSERT INTO job_fts(job_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES}); "
+        f"INSERT INTO job_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES}); END"
+    )
+    # Index the jobs that already exist.
+    op.execute("INSERT INTO job_fts(job_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS job_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS job_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS job_fts_ai")
+    op.execute("DROP TABLE IF EXISTS job_fts")
@@ -0,0 +1,57 @@
+"""Add job summary
+
+Revision ID: b7e2c94d1f35
+Revises: 4b9d2f7e1c60
+Create Date: 2026-10-18 21:05:33.614902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2c94d1f35'
+down_revision = '4b9d2f7e1c60'
+branch_labels = None
+depends_on = None
+
+SUMMARY_LENGTH = 200
+BATCH_SIZE = 1000
+
+
+def _summarize(text, length=SUMMARY_LENGTH):
+    # models.summarize as of this revision
+    text = ' '.join((text or '').split())
+    if len(text) <= length:
+        return text
+    cut = text.rfind(' ', 0, length - 1)
+    return text[:cut if cut > 0 else length - 1].rstrip() + '…'
+
+
+def upgrade():
+    # added in place rather than through batch mode, which would rebuild
+    # the job table (and drop its full-text triggers) on SQLite
+    op.add_column('job', sa.Column('summary', sa.String(length=SUMMARY_LENGTH), nullable=True))
+
+    job = sa.table('job', sa.column('id', sa.Integer), sa.column('description', sa.Text),
+                   sa.column('summary', sa.String))
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(job.c.id, job.c.description)
+            .where(job.c.id > last_id)
+            .order_by(job.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            job.update().where(job.c.id == sa.bindparam('job_id')).values(summary=sa.bindparam('new_summary')),
+            [{'job_id': job_id, 'new_summary': _summarize(description)} for job_id, description in rows]
+        )
+        last_id = rows[-1][0]
+
+
+def downgrade():
+    op.drop_column('job', 'summary')
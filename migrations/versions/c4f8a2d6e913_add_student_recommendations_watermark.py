@@ -0,0 +1,32 @@
+"""Add student recommendations watermark
+
+Revision ID: c4f8a2d6e913
+Revises: b7e2c94d1f35
+Create Date: 2026-10-18 23:12:47.208315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f8a2d6e913'
+down_revision = 'b7e2c94d1f35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('student', sa.Column('recommendations_job_id', sa.Integer(), nullable=True))
+
+    # students with a stored list were scored by the last refresh; the
+    # rest are scored against every job once more
+    op.execute(
+        "UPDATE student SET recommendations_job_id = "
+        "(SELECT value FROM site_counter WHERE name = 'recommendations_job_id') "
+        "WHERE id IN (SELECT student_id FROM job_recommendation)"
+    )
+
+
+def downgrade():
+    op.drop_column('student', 'recommendations_job_id')
@@ -0,0 +1,25 @@
+"""Seed jobs version counter
+
+Revision ID: e7c1a4f5b203
+Revises: a9f3b61c2e58
+Create Date: 2026-10-18 13:48:33.201447
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7c1a4f5b203'
+down_revision = 'a9f3b61c2e58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Version counter for cached job listings (see counters.JOBS_VERSION)
+    op.execute("INSERT INTO site_counter (name, value) VALUES ('jobs_version', 0)")
+
+
+def downgrade():
+    op.execute("DELETE FROM site_counter WHERE name = 'jobs_version'")
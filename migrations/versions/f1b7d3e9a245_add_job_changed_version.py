@@ -0,0 +1,51 @@
+"""Add job changed version
+
+Revision ID: f1b7d3e9a245
+Revises: c4f8a2d6e913
+Create Date: 2026-10-18 23:48:05.671932
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b7d3e9a245'
+down_revision = 'c4f8a2d6e913'
+branch_labels = None
+depends_on = None
+
+
+# as in 8c41f2a9d7e3
+COLUMNS = 'title, company, location, tags, description'
+NEW_VALUES = 'new.title, new.company, new.location, new.tags, new.description'
+OLD_VALUES = 'old.title, old.company, old.location, old.tags, old.description'
+
+
+def _update_trigger(columns):
+    op.execute("DROP TRIGGER IF EXISTS job_fts_au")
+    op.execute(
+        f"CREATE TRIGGER job_fts_au AFTER UPDATE{columns} ON job BEGIN "
+        f"INSERT INTO job_fts(job_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES}); "
+        f"INSERT INTO job_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES}); END"
+    )
+
+
+def upgrade():
+    # added in place rather than through batch mode, which would rebuild
+    # the job table (and drop its full-text triggers) on SQLite. Existing
+    # rows stay NULL: caches built before this load every job anyway.
+    op.add_column('job', sa.Column('changed_version', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_job_changed_version'), 'job', ['changed_version'], unique=False)
+
+    # every session write to a job now also stamps it; only changes to the
+    # indexed columns need to reindex the row
+    if op.get_bind().dialect.name == 'sqlite':
+        _update_trigger(f' OF {COLUMNS}')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        _update_trigger('')
+    op.drop_index(op.f('ix_job_changed_version'), table_name='job')
+    op.drop_column('job', 'changed_version')
@@ -5,15 +5,16 @@ from datetime import datetime
 class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password = db.Column(db.String(128), nullable=False)
+    password = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(20), nullable=False, default='student')  # 'student' or 'admin'
     student = db.relationship('Student', backref='user', uselist=False)
 
 class Student(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     name = db.Column(db.String(100), nullable=False)
-    resume = db.Column(db.String(150)) 
+    resume = db.Column(db.String(150))  # uploaded file name (legacy rows: path under static/resumes)
+    resume_sha256 = db.Column(db.String(64), db.ForeignKey('resume_file.sha256'), nullable=True)
     
     # 🔽 Additional details
     github_id = db.Column(db.String(100))
@@ -23,19 +24,46 @@ class Student(db.Model):
     portfolio = db.Column(db.String(150))
     phone = db.Column(db.String(20))
     address = db.Column(db.String(250))  # New address field
+    # highest job id their stored recommendations were scored against;
+    # NULL until the first refresh that scores them (see recommendations.py)
+    recommendations_job_id = db.Column(db.Integer, nullable=True)
     
     applied_jobs = db.relationship('Application', backref='student', lazy=True)
     
+class ResumeFile(db.Model):
+    # One row per distinct resume content, shared by every student who uploaded it (see resume_storage.py)
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_on = db.Column(db.DateTime, default=datetime.utcnow)
+    text = db.Column(db.Text, nullable=True)  # extracted by resume_search.py
+    text_extracted_on = db.Column(db.DateTime, nullable=True)
+
 class Category(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
 
+# Length of Job.summary, the part of a description list pages show.
+SUMMARY_LENGTH = 200
+
+
+def summarize(text, length=SUMMARY_LENGTH):
+    """The start of `text`, whitespace collapsed, cut at a word with an ellipsis."""
+    text = ' '.join((text or '').split())
+    if len(text) <= length:
+        return text
+    cut = text.rfind(' ', 0, length - 1)
+    return text[:cut if cut > 0 else length - 1].rstrip() + '\u2026'
+
+
 class Job(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     company = db.Column(db.String(100), nullable=False)
     location = db.Column(db.String(100), nullable=False)
-    description = db.Column(db.Text, nullable=False)
+    # Only loaded when read; listings show `summary` instead
+    description = db.deferred(db.Column(db.Text, nullable=False))
+    summary = db.Column(db.String(SUMMARY_LENGTH))  # kept in step with description
     job_type = db.Column(db.String(50))  # e.g., Full-time, Part-time
     experience_level = db.Column(db.String(50))  # Entry, Mid, Senior
 
@@ -45,15 +73,81 @@ class Job(db.Model):
 
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=True)
     tags = db.Column(db.String(100))  # Optional: "Python,Remote,Internship"
-    posted_on = db.Column(db.DateTime, default=datetime.utcnow)
+    posted_on = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    # jobs_version of this row's last change (see counters.py); NULL for
+    # rows written before it existed and benchmark data
+    changed_version = db.Column(db.Integer, nullable=True, index=True)
 
     category = db.relationship('Category', backref='jobs')
     applications = db.relationship('Application', backref='job', cascade="all, delete-orphan", lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_job_category_id_min_salary', 'category_id', 'min_salary'),
+    )
+
+    @db.validates('description')
+    def _update_summary(self, key, description):
+        self.summary = summarize(description)
+        return description
+
 
 class Application(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
     job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False)
-    applied_on = db.Column(db.DateTime, default=datetime.utcnow)
+    applied_on = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     status = db.Column(db.String(20), default='pending')  # 'pending', 'accepted', 'rejected'
+
+    __table_args__ = (
+        # A student can apply to each job once; also serves lookups by student_id
+        db.Index('uq_application_student_job', 'student_id', 'job_id', unique=True),
+        db.Index('ix_application_job_id_status', 'job_id', 'status'),
+    )
+
+
+class ExportJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, nullable=True)  # None exports every job's applicants
+    file_format = db.Column(db.String(10), nullable=False, default='xlsx')  # 'xlsx' or 'csv'
+    status = db.Column(db.String(20), nullable=False, default='queued')  # 'queued', 'running', 'done', 'failed'
+    filename = db.Column(db.String(255))
+    row_count = db.Column(db.Integer)
+    error = db.Column(db.Text)
+    requested_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    created_on = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_on = db.Column(db.DateTime)
+
+
+class SiteCounter(db.Model):
+    # Precomputed row counts (see counters.py), one row per counted table
+    name = db.Column(db.String(50), primary_key=True)  # 'jobs', 'students', 'applications'
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DailyMetric(db.Model):
+    # Per-day, per-category event counts for the analytics charts (see rollups.py)
+    day = db.Column(db.Date, primary_key=True)
+    metric = db.Column(db.String(50), primary_key=True)  # 'jobs_posted', 'applications', 'status:<status>'
+    category_id = db.Column(db.Integer, primary_key=True, default=0)  # 0 when the job has no category
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+class JobRecommendation(db.Model):
+    # Precomputed top-N job recommendations per student (see recommendations.py)
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id', ondelete='CASCADE'), primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True)  # 1 is the best match
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id', ondelete='CASCADE'), nullable=False)
+    score = db.Column(db.Float, nullable=False)
+
+
+class JobSignature(db.Model):
+    # MinHash signature of each job's text (see job_similarity.py)
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id', ondelete='CASCADE'), primary_key=True)
+    signature = db.Column(db.LargeBinary, nullable=False)
+
+
+class JobBand(db.Model):
+    # LSH buckets: jobs sharing a (band, bucket) pair are similarity candidates
+    band = db.Column(db.Integer, primary_key=True)
+    bucket = db.Column(db.BigInteger, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id', ondelete='CASCADE'), primary_key=True, index=True)
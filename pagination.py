@@ -0,0 +1,117 @@
+import base64
+import json
+from datetime import datetime
+
+from flask import abort, current_app, request
+from sqlalchemy import Select, and_, or_
+
+from extensions import db
+
+
+class KeysetPage:
+    """One page of a keyset-paginated query.
+
+    `next_cursor` is an opaque token encoding the sort key of the last row;
+    passing it back as `?cursor=` continues right after that row.
+    """
+
+    def __init__(self, items, next_cursor, cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def is_first(self):
+        return self.cursor is None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(key, value):
+    if value is None:
+        return None
+    python_type = key.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values):
+    raw = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, keys):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if len(values) != len(keys):
+            raise ValueError('cursor does not match sort keys')
+        return [_decode_value(k, v) for k, v in zip(keys, values)]
+    except (ValueError, TypeError):
+        abort(400, description='Invalid pagination cursor.')
+
+
+def _after(keys, values):
+    """Rows strictly after `values` in descending (k1, k2, ...) order."""
+    clauses = []
+    for i, key in enumerate(keys):
+        equal_prefix = [k == v for k, v in zip(keys[:i], values[:i])]
+        clauses.append(and_(*equal_prefix, key < values[i]))
+    return or_(*clauses)
+
+
+def get_page_size():
+    default = current_app.config['PAGE_SIZE']
+    size = request.args.get('per_page', default, type=int)
+    return max(1, min(size, current_app.config['MAX_PAGE_SIZE']))
+
+
+def paginate(query, keys, cursor=None, per_page=None):
+    """Return a KeysetPage of `query` ordered by `keys`, newest first.
+
+    `keys` must end in a unique column (normally the primary key) so the
+    ordering is total. Each page is a single indexed range scan of
+    `per_page + 1` rows, however deep into the listing it is, unlike
+    OFFSET which has to walk every skipped row.
+
+    `query` is either an ORM Query, whose first entity (normally a model)
+    makes up the items, or a Core select(), whose rows are the items as
+    plain tuples.
+    """
+    keys = list(keys)
+    if cursor is None:
+        cursor = request.args.get('cursor') or None
+    if per_page is None:
+        per_page = get_page_size()
+
+    query = query.order_by(None).order_by(*[k.desc() for k in keys])
+    if cursor:
+        query = query.filter(_after(keys, decode_cursor(cursor, keys)))
+
+    query = query.add_columns(*keys).limit(per_page + 1)
+    if isinstance(query, Select):
+        rows = db.session.execute(query).all()
+        items = [tuple(row[:-len(keys)]) for row in rows]
+    else:
+        rows = query.all()
+        items = [row[0] for row in rows]
+    next_cursor = None
+    if len(rows) > per_page:
+        items = items[:per_page]
+        next_cursor = encode_cursor(rows[per_page - 1][-len(keys):])
+    return KeysetPage(items, next_cursor, cursor)
@@ -0,0 +1,267 @@
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from extensions import db
+
+# Request diagnostics: an on-demand sampling profiler, a slow-query log
+# and an N+1 detector.
+#
+# The profiler is off until an admin turns it on at /admin/profiling.
+# While on, it samples PROFILE_SAMPLE_RATE of requests, plus any admin
+# request sent with the PROFILE_HEADER header (e.g. `X-Profile: 1`). A
+# sampler thread reads the request thread's stack every PROFILE_INTERVAL
+# seconds; when the request ends the stacks are written to PROFILE_FOLDER
+# in the collapsed-stack format ("frame;frame;frame count" per line),
+# which flamegraph.pl and speedscope.app turn into flame graphs. The
+# admin's settings are kept in a file in that folder, so every worker
+# picks them up within a second.
+#
+# Independently of the profiler, every statement that runs for
+# SLOW_QUERY_MS or longer is logged with the route it ran for, and a
+# request that runs the same SQL text N_PLUS_ONE_THRESHOLD times or more
+# (a query per row of an earlier result, typically a lazy-loaded
+# relationship in a loop) is logged as a likely N+1. The latest of each
+# are also kept in memory, per process, for /admin/profiling. Parameters
+# are never logged. 0 turns either check off.
+
+PROFILE_SUFFIX = '.collapsed'
+SETTINGS_FILE = 'settings.json'
+RECENT_REPORTS = 100  # slow queries and N+1 reports kept for the admin page
+STATEMENT_PREVIEW = 2000  # characters of SQL kept per report
+
+slow_queries = deque(maxlen=RECENT_REPORTS)
+n_plus_one_reports = deque(maxlen=RECENT_REPORTS)
+
+
+def profile_folder(app=None):
+    app = app or current_app
+    folder = app.config.get('PROFILE_FOLDER') or os.path.join(app.instance_path, 'profiles')
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+# ---------- Profiler settings ----------
+
+class ProfilerSettings:
+    """The admin's profiler settings, shared by all workers through a file.
+
+    Workers look at the file's mtime at most once a second, so checking
+    costs nothing per request.
+    """
+
+    def __init__(self, recheck=1.0):
+        self.recheck = recheck
+        self._checked = 0.0
+        self._mtime = None
+        self._values = None
+        self._lock = threading.Lock()
+
+    def _defaults(self, app):
+        return {
+            'enabled': app.config['PROFILER_ENABLED'],
+            'sample_rate': app.config['PROFILE_SAMPLE_RATE'],
+        }
+
+    def get(self, app):
+        if self._values is not None and time.monotonic() - self._checked < self.recheck:
+            return self._values
+        with self._lock:
+            self._checked = time.monotonic()
+            path = os.path.join(profile_folder(app), SETTINGS_FILE)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            if self._values is None or mtime != self._mtime:
+                values = self._defaults(app)
+                if mtime is not None:
+                    try:
+                        with open(path) as f:
+                            values.update(json.load(f))
+                    except (OSError, ValueError) as exc:
+                        app.logger.warning('Ignoring unreadable profiler settings %s: %s', path, exc)
+                self._values, self._mtime = values, mtime
+            return self._values
+
+    def save(self, app, enabled, sample_rate):
+        folder = profile_folder(app)
+        partial = os.path.join(folder, f'{SETTINGS_FILE}.{os.getpid()}.tmp')
+        with open(partial, 'w') as f:
+            json.dump({'enabled': enabled, 'sample_rate': sample_rate}, f)
+        os.replace(partial, os.path.join(folder, SETTINGS_FILE))
+        self._values = None  # reread on the next request
+
+
+settings = ProfilerSettings()
+
+
+# ---------- Stack sampler ----------
+
+def _frame_name(frame):
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', '?')
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name)}".replace(';', ':')
+
+
+class StackSampler:
+    """Counts the stacks of one thread, sampled from a background thread."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}  # tuple of frame names, root first -> samples
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                stack = tuple(reversed(names))
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        """The samples in collapsed-stack format."""
+        return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+def _write_profile(app, sampler, endpoint, seconds):
+    folder = profile_folder(app)
+    stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+    name = re.sub(r'[^\w.-]', '_', endpoint)
+    with open(os.path.join(folder, f'{stamp}-{name}-{seconds * 1000:.0f}ms{PROFILE_SUFFIX}'), 'w') as f:
+        f.write(sampler.collapsed())
+    # keep the newest PROFILE_KEEP
+    profiles = sorted(entry for entry in os.listdir(folder) if entry.endswith(PROFILE_SUFFIX))
+    for old in profiles[:-app.config['PROFILE_KEEP']]:
+        try:
+            os.remove(os.path.join(folder, old))
+        except FileNotFoundError:
+            pass  # another worker got there first
+
+
+def list_profiles(limit=50):
+    """(name, size in bytes, modified) of the newest saved profiles."""
+    folder = profile_folder()
+    names = sorted((entry for entry in os.listdir(folder) if entry.endswith(PROFILE_SUFFIX)), reverse=True)
+    profiles = []
+    for name in names[:limit]:
+        try:
+            stat = os.stat(os.path.join(folder, name))
+        except FileNotFoundError:
+            continue
+        profiles.append((name, stat.st_size, datetime.fromtimestamp(stat.st_mtime)))
+    return profiles
+
+
+# ---------- Request hooks ----------
+
+class _RequestDiagnostics:
+    __slots__ = ('started', 'statements', 'sampler')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = {}  # SQL text -> times run
+        self.sampler = None
+
+
+def _route():
+    if has_request_context():
+        return request.endpoint or '(unmatched)', request.path
+    return '(background)', None
+
+
+def _wants_profile(app):
+    current = settings.get(app)
+    if not current['enabled']:
+        return False
+    if random.random() < current['sample_rate']:
+        return True
+    if app.config['PROFILE_HEADER'] in request.headers:
+        from flask_login import current_user
+        return current_user.is_authenticated and current_user.role == 'admin'
+    return False
+
+
+def init_app(app):
+    """Install the profiler, slow-query and N+1 hooks; call after db.init_app."""
+    slow_seconds = app.config['SLOW_QUERY_MS'] / 1000
+    repeat_threshold = app.config['N_PLUS_ONE_THRESHOLD']
+    logger = app.logger
+
+    def start_request():
+        state = g._diagnostics = _RequestDiagnostics()
+        if _wants_profile(app):
+            state.sampler = StackSampler(threading.get_ident(), app.config['PROFILE_INTERVAL'])
+            state.sampler.start()
+
+    def finish_request(exc):
+        state = g.pop('_diagnostics', None)
+        if state is None:
+            return
+        endpoint, path = _route()
+        if state.sampler is not None:
+            state.sampler.stop()
+            try:
+                _write_profile(app, state.sampler, endpoint, time.perf_counter() - state.started)
+            except OSError as error:
+                logger.warning('Could not save the profile of %s: %s', path, error)
+        if repeat_threshold:
+            for statement, count in state.statements.items():
+                if count >= repeat_threshold:
+                    logger.warning('Possible N+1 in %s (%s): statement ran %d times: %s',
+                                   endpoint, path, count, statement[:STATEMENT_PREVIEW])
+                    n_plus_one_reports.append({
+                        'when': datetime.utcnow(), 'endpoint': endpoint, 'path': path,
+                        'count': count, 'statement': statement[:STATEMENT_PREVIEW],
+                    })
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._diagnostics_started = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        state = g.get('_diagnostics') if has_request_context() else None
+        if state is not None and repeat_threshold:
+            state.statements[statement] = state.statements.get(statement, 0) + 1
+        started = getattr(context, '_diagnostics_started', None)
+        if started is None or not slow_seconds:
+            return
+        seconds = time.perf_counter() - started
+        if seconds >= slow_seconds:
+            endpoint, path = _route()
+            logger.warning('Slow query (%.0f ms) in %s (%s): %s',
+                           seconds * 1000, endpoint, path, statement[:STATEMENT_PREVIEW])
+            slow_queries.append({
+                'when': datetime.utcnow(), 'endpoint': endpoint, 'path': path,
+                'ms': round(seconds * 1000, 1), 'statement': statement[:STATEMENT_PREVIEW],
+            })
+
+    # first in line, so the profile covers the app's before_request hooks;
+    # metrics.init_app, installed after this, puts its own hook in front
+    app.before_request_funcs.setdefault(None, []).insert(0, start_request)
+    app.teardown_request(finish_request)
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', after_cursor_execute)
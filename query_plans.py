@@ -0,0 +1,56 @@
+import re
+
+import click
+from sqlalchemy import text
+
+from extensions import db
+from models import Application, Job, Student
+
+# The queries behind the busiest pages, with representative parameters.
+# Each must be answered from an index rather than a full table scan.
+HOT_QUERIES = {
+    'application by student and job': lambda: Application.query.filter_by(student_id=1, job_id=1),
+    'applications of a student': lambda: Application.query.filter_by(student_id=1),
+    'applicants of a job': lambda: Application.query.filter_by(job_id=1),
+    'pending applicants of a job': lambda: Application.query.filter_by(job_id=1, status='pending'),
+    'applications newest first': lambda: Application.query.order_by(Application.applied_on.desc(), Application.id.desc()).limit(20),
+    'jobs newest first': lambda: Job.query.order_by(Job.posted_on.desc(), Job.id.desc()).limit(20),
+    'jobs by category and salary': lambda: Job.query.filter(Job.category_id == 1, Job.min_salary >= 1000),
+    'jobs changed since a version': lambda: Job.query.filter(Job.changed_version > 1),
+    'student of a user': lambda: Student.query.filter_by(user_id=1),
+}
+
+# "SCAN job" is a full table scan; "SCAN job USING INDEX ..." walks an
+# index in order and is fine for the LIMITed listings above.
+_FULL_SCAN_RE = re.compile(r'^SCAN (TABLE )?\w+$')
+
+
+def explain(query):
+    statement = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+    rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {statement}')).all()
+    return [row[-1] for row in rows]
+
+
+def full_scans():
+    """Return {query label: plan lines} for hot queries that scan a whole table."""
+    failures = {}
+    for label, build in HOT_QUERIES.items():
+        plan = explain(build())
+        if any(_FULL_SCAN_RE.match(line) for line in plan):
+            failures[label] = plan
+    return failures
+
+
+@click.command('check-query-plans')
+def check_query_plans_command():
+    """Fail if any hot query falls back to a full table scan."""
+    if db.engine.dialect.name != 'sqlite':
+        raise click.ClickException('Query plan check only supports SQLite.')
+    failures = full_scans()
+    for label, plan in failures.items():
+        click.echo(f'FULL SCAN: {label}')
+        for line in plan:
+            click.echo(f'    {line}')
+    if failures:
+        raise click.ClickException(f'{len(failures)} hot queries scan a full table.')
+    click.echo(f'All {len(HOT_QUERIES)} hot queries use indexes.')
@@ -0,0 +1,212 @@
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+from flask import current_app
+from sqlalchemy import delete, exists, insert, update
+
+from extensions import db
+from matching import SparseRows, match_index, merge_vectors, top_k
+from models import Application, Job, JobRecommendation, SiteCounter, Student
+
+# "Recommended for you" is read from job_recommendation, a precomputed
+# top-N list per student, so the dashboard does one primary-key range scan
+# instead of scoring jobs on every visit.
+#
+# Each student is matched against jobs with the same hashed TF-IDF vectors
+# as applicant ranking (matching.py); their profile vector is their
+# experience and resume text plus the jobs they have applied to, so past
+# applications pull in similar postings. Students are processed in
+# batches of RECOMMENDATION_BATCH_SIZE, one transaction per batch.
+#
+# New jobs are folded in incrementally: a site counter records the highest
+# job id already scored, and a refresh scores only the jobs above it and
+# merges them into each student's stored list. Each student also records
+# the watermark they were last scored at (Student.recommendations_job_id),
+# so a student with no matches is told apart from one never scored: only
+# the latter is scored against every job. A full refresh
+# (`flask refresh-recommendations --full`) rescores everything, e.g.
+# nightly, to pick up profile edits and IDF drift.
+WATERMARK = 'recommendations_job_id'
+
+# Weight of applied-to jobs' terms in a student's profile vector, split
+# evenly between those jobs.
+APPLIED_WEIGHT = 0.5
+
+_executor = None
+
+
+def _get_watermark():
+    counter = db.session.get(SiteCounter, WATERMARK)
+    return counter.value if counter is not None else 0
+
+
+def _set_watermark(value):
+    db.session.merge(SiteCounter(name=WATERMARK, value=value))
+
+
+def _applied_jobs(student_ids):
+    applied = defaultdict(set)
+    rows = db.session.query(Application.student_id, Application.job_id).filter(
+        Application.student_id.in_(student_ids)
+    )
+    for student_id, job_id in rows:
+        applied[student_id].add(job_id)
+    return applied
+
+
+def _stored(student_ids):
+    stored = defaultdict(list)
+    rows = db.session.query(
+        JobRecommendation.student_id, JobRecommendation.job_id, JobRecommendation.score
+    ).filter(JobRecommendation.student_id.in_(student_ids))
+    for student_id, job_id, score in rows:
+        stored[student_id].append((job_id, score))
+    return stored
+
+
+class _Candidates:
+    """Jobs to score, flattened once for the whole refresh."""
+
+    def __init__(self, job_ids, job_vectors, idf):
+        self.job_ids = job_ids
+        self.positions = {job_id: i for i, job_id in enumerate(job_ids)}
+        self.rows = SparseRows([job_vectors[job_id] for job_id in job_ids], idf)
+
+    def best(self, vector, exclude, n):
+        """The `n` best-scoring jobs for `vector` as (job id, score), skipping `exclude`."""
+        scores = self.rows.cosine(vector)
+        for job_id in exclude:
+            if job_id in self.positions:
+                scores[self.positions[job_id]] = 0  # never recommend what they applied to
+        return [(self.job_ids[i], float(scores[i])) for i in top_k(scores, n) if scores[i] > 0]
+
+
+def refresh(full=False, batch_size=None):
+    """Recompute stored recommendations; return how many students were scored.
+
+    Without `full`, only jobs posted since the last refresh are scored and
+    merged into the existing lists.
+    """
+    config = current_app.config
+    top_n = config['RECOMMENDATION_COUNT']
+    batch_size = batch_size or config['RECOMMENDATION_BATCH_SIZE']
+
+    job_ids, vectors, idf = match_index.job_vectors()
+    job_vectors = dict(zip(job_ids, vectors))
+    high_water = max(job_ids, default=0)
+    watermark = 0 if full else _get_watermark()
+
+    candidate_ids = [job_id for job_id in job_ids if job_id > watermark]
+    if not candidate_ids:
+        _set_watermark(high_water)
+        db.session.commit()
+        return 0
+    candidates = _Candidates(candidate_ids, job_vectors, idf)
+    everything = None  # all jobs, for students who have no list yet
+
+    scored = 0
+    last_id = 0
+    while True:
+        students = (
+            db.session.query(Student.id, Student.experience, Student.resume_sha256,
+                             Student.recommendations_job_id)
+            .filter(Student.id > last_id)
+            .order_by(Student.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not students:
+            break
+        last_id = students[-1].id
+        student_ids = [s.id for s in students]
+        applied = _applied_jobs(student_ids)
+        stored = {} if full else _stored(student_ids)
+
+        rows = []
+        for student, vector in zip(students, match_index.student_vectors(students)):
+            seen = applied.get(student.id, set())
+            liked = [job_vectors[job_id] for job_id in seen if job_id in job_vectors]
+            if liked:
+                share = APPLIED_WEIGHT / len(liked)
+                vector = merge_vectors(vector, *[(idx, counts * share) for idx, counts in liked])
+
+            if full or student.recommendations_job_id is not None:
+                best = candidates.best(vector, seen, top_n)
+            else:
+                # new since the last refresh: score them against every job
+                if everything is None:
+                    everything = candidates if watermark == 0 else _Candidates(job_ids, job_vectors, idf)
+                best = everything.best(vector, seen, top_n)
+
+            kept = [
+                (job_id, score) for job_id, score in stored.get(student.id, ())
+                if job_id in job_vectors and job_id not in seen and job_id <= watermark
+            ]
+            merged = sorted(kept + best, key=lambda item: item[1], reverse=True)[:top_n]
+            rows.extend(
+                {'student_id': student.id, 'rank': rank, 'job_id': job_id, 'score': score}
+                for rank, (job_id, score) in enumerate(merged, 1)
+            )
+
+        db.session.execute(delete(JobRecommendation).where(JobRecommendation.student_id.in_(student_ids)))
+        if rows:
+            db.session.execute(insert(JobRecommendation), rows)
+        db.session.execute(
+            update(Student).where(Student.id.in_(student_ids)).values(recommendations_job_id=high_water),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.commit()
+        scored += len(students)
+
+    _set_watermark(high_water)
+    db.session.commit()
+    return scored
+
+
+def recommended_jobs(student_id, limit):
+    """A student's stored recommendations, best first, minus jobs they applied to since."""
+    applied = exists().where(
+        Application.student_id == student_id,
+        Application.job_id == JobRecommendation.job_id
+    )
+    return (
+        Job.query
+        .join(JobRecommendation, JobRecommendation.job_id == Job.id)
+        .filter(JobRecommendation.student_id == student_id, ~applied)
+        .order_by(JobRecommendation.rank)
+        .limit(limit)
+        .all()
+    )
+
+
+# ---------- Background refresh ----------
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # a single spawn worker: refreshes run one after another, and
+        # children must not share the parent's database connections
+        _executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+    return _executor
+
+
+def run_refresh():
+    """Worker entry point: fold newly posted jobs into everyone's list."""
+    from app import app
+
+    with app.app_context():
+        refresh()
+
+
+def queue_refresh():
+    """Refresh recommendations in the background after jobs are posted."""
+    return _get_executor().submit(run_refresh)
+
+
+@click.command('refresh-recommendations')
+@click.option('--full', is_flag=True, help='Rescore every job, not just those posted since the last refresh.')
+def refresh_recommendations_command(full):
+    """Recompute the precomputed job recommendations."""
+    click.echo(f'Refreshed recommendations for {refresh(full=full)} students.')
@@ -0,0 +1,232 @@
+import multiprocessing
+import os
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, wait
+from datetime import datetime
+
+import click
+from flask import current_app
+from markupsafe import Markup, escape
+from pypdf import PdfReader
+from sqlalchemy import Float, Integer, String, or_, text
+from sqlalchemy.orm import joinedload
+
+from extensions import db
+from models import ResumeFile, Student
+from search import build_match_expression, fts_enabled
+
+
+# Candidate search index: one row per student (rowid = student.id) holding
+# their name, the free-text experience from their profile and the text
+# extracted from their resume. Resume text is stored once per ResumeFile,
+# keyed by content hash, so a PDF shared by several students is extracted
+# once. Triggers on `student` and on `resume_file.text` keep the index in
+# sync, so extraction finishing in a worker process is enough to make a
+# resume searchable.
+FTS_TABLE = 'student_fts'
+FTS_COLUMNS = ('name', 'experience', 'resume')
+
+# bm25() weights, in FTS_COLUMNS order.
+BM25_WEIGHTS = (10.0, 3.0, 1.0)
+
+# Extracted text is truncated to this many characters.
+MAX_TEXT_CHARS = 100_000
+
+# Markers put around matched terms by snippet(); replaced with <mark> after
+# the excerpt has been HTML-escaped.
+_HIT_OPEN, _HIT_CLOSE = '\x02', '\x03'
+
+_executor = None
+
+
+# ---------- Text extraction ----------
+
+def normalize_text(value):
+    """Collapse whitespace, drop control characters and cap the length."""
+    value = unicodedata.normalize('NFKC', value)
+    value = ''.join(ch if ch.isprintable() or ch == '\n' else ' ' for ch in value)
+    lines = (' '.join(line.split()) for line in value.splitlines())
+    return '\n'.join(line for line in lines if line)[:MAX_TEXT_CHARS]
+
+
+def extract_pdf_text(path):
+    """Extract and normalize the text of the PDF at `path`."""
+    reader = PdfReader(path)
+    return normalize_text('\n'.join(page.extract_text() or '' for page in reader.pages))
+
+
+# ---------- Background extraction ----------
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # spawn rather than fork: children must not share the parent's
+        # database connections
+        _executor = ProcessPoolExecutor(
+            max_workers=current_app.config['RESUME_EXTRACT_WORKERS'],
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return _executor
+
+
+def extract_resume(sha256):
+    """Worker entry point: extract the text of one stored resume."""
+    from app import app
+    from resume_storage import path_for_hash
+
+    with app.app_context():
+        record = db.session.get(ResumeFile, sha256)
+        path = path_for_hash(sha256, app)
+        if record is None or record.text_extracted_on is not None or not os.path.exists(path):
+            return
+        try:
+            record.text = extract_pdf_text(path)
+        except Exception as exc:
+            # unreadable PDFs are marked done with no text rather than retried
+            current_app.logger.warning('Could not extract text from resume %s: %s', sha256, exc)
+            record.text = ''
+        record.text_extracted_on = datetime.utcnow()
+        db.session.commit()
+
+
+def queue_extraction(sha256):
+    """Extract a resume's text in the background unless already done."""
+    pending = db.session.query(ResumeFile.sha256).filter(
+        ResumeFile.sha256 == sha256,
+        ResumeFile.text_extracted_on.is_(None)
+    ).first()
+    if pending:
+        return _get_executor().submit(extract_resume, sha256)
+    return None
+
+
+def pending_hashes():
+    return [sha256 for (sha256,) in db.session.query(ResumeFile.sha256).filter(
+        ResumeFile.text_extracted_on.is_(None),
+        ResumeFile.ref_count > 0
+    )]
+
+
+# ---------- Index and search ----------
+
+def _index_ddl():
+    cols = ', '.join(FTS_COLUMNS)
+    resume_text = 'SELECT text FROM resume_file WHERE sha256 = new.resume_sha256'
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"{cols}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON student BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, {cols}) "
+        f"VALUES (new.id, new.name, new.experience, ({resume_text})); END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON student BEGIN "
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, experience, resume_sha256 ON student BEGIN "
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; "
+        f"INSERT INTO {FTS_TABLE}(rowid, {cols}) "
+        f"VALUES (new.id, new.name, new.experience, ({resume_text})); END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_resume_au AFTER UPDATE OF text ON resume_file BEGIN "
+        f"DELETE FROM {FTS_TABLE} WHERE rowid IN (SELECT id FROM student WHERE resume_sha256 = new.sha256); "
+        f"INSERT INTO {FTS_TABLE}(rowid, {cols}) "
+        f"SELECT id, name, experience, new.text FROM student WHERE resume_sha256 = new.sha256; END",
+    ]
+
+
+def _populate_sql():
+    cols = ', '.join(FTS_COLUMNS)
+    return (
+        f"INSERT INTO {FTS_TABLE}(rowid, {cols}) "
+        "SELECT student.id, student.name, student.experience, resume_file.text "
+        "FROM student LEFT JOIN resume_file ON resume_file.sha256 = student.resume_sha256"
+    )
+
+
+def rebuild_index():
+    """Create the index and triggers if missing and repopulate from `student`."""
+    with db.engine.begin() as conn:
+        for statement in _index_ddl():
+            conn.execute(text(statement))
+        conn.execute(text(f"DELETE FROM {FTS_TABLE}"))
+        conn.execute(text(_populate_sql()))
+
+
+def _highlight(excerpt):
+    if excerpt is None:
+        return None
+    return Markup(str(escape(excerpt)).replace(_HIT_OPEN, '<mark>').replace(_HIT_CLOSE, '</mark>'))
+
+
+def search_students(query, limit=50):
+    """Rank students by how well their name, experience and resume match.
+
+    Returns `(student, excerpt)` pairs, best match first; `excerpt` is a
+    highlighted snippet of the best-matching column, or None on databases
+    without the FTS5 index, where an unranked ILIKE scan is used instead.
+    """
+    if not fts_enabled(FTS_TABLE):
+        pattern = f'%{query}%'
+        students = (
+            Student.query
+            .outerjoin(ResumeFile, Student.resume_sha256 == ResumeFile.sha256)
+            .filter(or_(
+                Student.name.ilike(pattern),
+                Student.experience.ilike(pattern),
+                ResumeFile.text.ilike(pattern)
+            ))
+            .options(joinedload(Student.user))
+            .limit(limit)
+            .all()
+        )
+        return [(student, None) for student in students]
+
+    match = build_match_expression(query)
+    if not match:
+        return []
+
+    weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+    hits = (
+        text(
+            f"SELECT rowid AS student_id, -bm25({FTS_TABLE}, {weights}) AS score, "
+            f"snippet({FTS_TABLE}, -1, :open, :close, '…', 16) AS excerpt "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match "
+            f"ORDER BY score DESC LIMIT :limit"
+        )
+        .bindparams(match=match, open=_HIT_OPEN, close=_HIT_CLOSE, limit=limit)
+        .columns(student_id=Integer, score=Float, excerpt=String)
+        .subquery('student_hits')
+    )
+    rows = (
+        db.session.query(Student, hits.c.excerpt)
+        .join(hits, Student.id == hits.c.student_id)
+        .options(joinedload(Student.user))
+        .order_by(hits.c.score.desc())
+        .all()
+    )
+    return [(student, _highlight(excerpt)) for student, excerpt in rows]
+
+
+@click.command('extract-resumes')
+@click.option('--workers', type=int, default=None, help='Worker processes (default RESUME_EXTRACT_WORKERS).')
+def extract_resumes_command(workers):
+    """Extract text from every resume not yet indexed."""
+    hashes = pending_hashes()
+    if not hashes:
+        click.echo('All resumes are already extracted.')
+        return
+    with ProcessPoolExecutor(
+        max_workers=workers or current_app.config['RESUME_EXTRACT_WORKERS'],
+        mp_context=multiprocessing.get_context('spawn')
+    ) as pool:
+        futures = [pool.submit(extract_resume, sha256) for sha256 in hashes]
+        wait(futures)
+    failed = sum(1 for f in futures if f.exception() is not None)
+    click.echo(f'Extracted {len(hashes) - failed} resumes ({failed} failed).')
+
+
+@click.command('rebuild-resume-index')
+def rebuild_resume_index_command():
+    """Rebuild the candidate full-text search index."""
+    if db.engine.dialect.name != 'sqlite':
+        click.echo('Full-text index is only used on SQLite; nothing to do.')
+        return
+    rebuild_index()
+    click.echo('Candidate search index rebuilt.')
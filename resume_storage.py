@@ -0,0 +1,233 @@
+import hashlib
+import os
+import tempfile
+
+import click
+from flask import current_app, request
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+from werkzeug.utils import send_file
+
+from extensions import db
+from models import ResumeFile, Student
+
+# Resumes are stored once per distinct content, named by their SHA-256:
+# <RESUME_FOLDER>/ab/cd/abcd....pdf. The path is a pure function of the
+# hash, so serving a resume needs no directory probing, and students who
+# upload the same PDF share one file. ResumeFile.ref_count tracks how many
+# students point at each file; it is deleted when that drops to zero.
+CHUNK_SIZE = 64 * 1024
+PDF_MAGIC = b'%PDF-'
+
+
+class InvalidResume(ValueError):
+    pass
+
+
+def resume_folder(app=None):
+    app = app or current_app
+    return app.config.get('RESUME_FOLDER') or os.path.join(app.instance_path, 'resumes')
+
+
+def path_for_hash(sha256, app=None):
+    return os.path.join(resume_folder(app), sha256[:2], sha256[2:4], f'{sha256}.pdf')
+
+
+def legacy_path(student):
+    """Where uploads from before content-addressed storage were saved."""
+    return os.path.join(current_app.root_path, 'static', 'resumes', os.path.basename(student.resume))
+
+
+def resume_path(student):
+    """Absolute path of a student's resume, or None if they have none."""
+    if student.resume_sha256:
+        return path_for_hash(student.resume_sha256)
+    if student.resume:
+        path = legacy_path(student)
+        return path if os.path.exists(path) else None
+    return None
+
+
+def send_resume(student, as_attachment=False):
+    """Response serving a student's resume, or None if they have none
+    or its file is missing.
+
+    Resumes are served with validators (the content hash as a strong
+    ETag, plus Last-Modified) so repeat views are answered with 304, and
+    with Range support so PDF viewers can fetch pages on demand. They are
+    private to the browser cache. With RESUME_SENDFILE set, the bytes are
+    left to the front proxy: 'x-sendfile' sends the file path and
+    'x-accel-redirect' sends RESUME_ACCEL_PREFIX plus the path relative to
+    the resume folder, which nginx maps to an internal location.
+    """
+    path = resume_path(student)
+    if path is None:
+        return None
+
+    config = current_app.config
+    offload = config.get('RESUME_SENDFILE')
+    relative = os.path.relpath(path, resume_folder())
+    if offload == 'x-accel-redirect' and relative.startswith(os.pardir):
+        offload = None  # legacy files outside the store have no internal location
+
+    # no exists() probe first: a missing file surfaces here instead
+    try:
+        response = send_file(
+            path,
+            request.environ,
+            mimetype='application/pdf',
+            as_attachment=as_attachment,
+            download_name=student.resume,
+            # a content hash never goes stale; legacy files get Werkzeug's
+            # mtime/size based tag
+            etag=student.resume_sha256 or True,
+            max_age=config['RESUME_CACHE_MAX_AGE'],
+            use_x_sendfile=bool(offload),
+            response_class=current_app.response_class,
+            # when offloading, the proxy answers Range requests itself
+            conditional=not offload,
+        )
+    except FileNotFoundError:
+        return None
+    response.cache_control.public = False
+    response.cache_control.private = True
+
+    if not offload:
+        response.accept_ranges = 'bytes'
+    else:
+        response.make_conditional(request.environ, accept_ranges=False)
+        if response.status_code == 304:
+            response.headers.pop('X-Sendfile', None)
+        elif offload == 'x-accel-redirect':
+            del response.headers['X-Sendfile']
+            prefix = config['RESUME_ACCEL_PREFIX'].rstrip('/')
+            response.headers['X-Accel-Redirect'] = f"{prefix}/{relative.replace(os.sep, '/')}"
+    return response
+
+
+def _spool(stream):
+    """Copy `stream` to a temporary file in the store, hashing as it goes."""
+    folder = resume_folder()
+    os.makedirs(folder, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if size == 0 and not chunk.startswith(PDF_MAGIC):
+                    raise InvalidResume('The file is not a PDF.')
+                digest.update(chunk)
+                size += len(chunk)
+                out.write(chunk)
+        if size == 0:
+            raise InvalidResume('The file is empty.')
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return tmp_path, digest.hexdigest(), size
+
+
+def _add_reference(sha256, size):
+    # One upsert, so two uploads of the same new file cannot both insert
+    insert = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}.get(db.engine.dialect.name)
+    if insert is not None:
+        stmt = insert(ResumeFile).values(sha256=sha256, size=size, ref_count=1)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['sha256'],
+            set_={'ref_count': ResumeFile.ref_count + 1}
+        ))
+        return
+    updated = db.session.execute(
+        update(ResumeFile)
+        .where(ResumeFile.sha256 == sha256)
+        .values(ref_count=ResumeFile.ref_count + 1)
+    ).rowcount
+    if not updated:
+        db.session.add(ResumeFile(sha256=sha256, size=size, ref_count=1))
+        db.session.flush()
+
+
+def _drop_reference(sha256):
+    """Decrement a file's count; return True if nothing references it any more."""
+    db.session.execute(
+        update(ResumeFile)
+        .where(ResumeFile.sha256 == sha256)
+        .values(ref_count=ResumeFile.ref_count - 1)
+    )
+    record = db.session.get(ResumeFile, sha256, populate_existing=True)
+    if record is not None and record.ref_count <= 0:
+        db.session.delete(record)
+        db.session.flush()
+        return True
+    return False
+
+
+def store_resume(student, file_storage):
+    """Stream an uploaded PDF into the store and point `student` at it.
+
+    Commits the session. Raises InvalidResume for anything that is not a
+    non-empty PDF.
+
+    A file whose last reference goes is unlinked inside the transaction
+    that deletes its ResumeFile row, so an upload of the same content
+    meanwhile waits on that row until the unlink is done. Uploads move
+    their own copy into place only after committing their reference,
+    even when the file already exists, so a committed reference always
+    has its file.
+    """
+    tmp_path, sha256, size = _spool(file_storage.stream)
+    try:
+        old_sha256 = student.resume_sha256
+        if old_sha256 != sha256:
+            _add_reference(sha256, size)
+            if old_sha256 and _drop_reference(old_sha256):
+                try:
+                    os.remove(path_for_hash(old_sha256))
+                except FileNotFoundError:
+                    pass
+        student.resume_sha256 = sha256
+        student.resume = os.path.basename(file_storage.filename or 'resume.pdf')
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        os.remove(tmp_path)
+        raise
+
+    path = path_for_hash(sha256)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(tmp_path, path)  # identical bytes if the file was already there
+    return sha256
+
+
+def import_legacy_resumes():
+    """Move resumes saved under static/resumes into the store; return how many."""
+    moved = 0
+    students = Student.query.filter(Student.resume.isnot(None), Student.resume_sha256.is_(None))
+    for student in students:
+        path = legacy_path(student)
+        if not os.path.exists(path):
+            continue
+        with open(path, 'rb') as f:
+            try:
+                tmp_path, sha256, size = _spool(f)
+            except InvalidResume:
+                continue
+        target = path_for_hash(sha256)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(tmp_path, target)
+        _add_reference(sha256, size)
+        student.resume_sha256 = sha256
+        student.resume = os.path.basename(student.resume)
+        moved += 1
+    db.session.commit()
+    return moved
+
+
+@click.command('import-legacy-resumes')
+def import_legacy_resumes_command():
+    """Copy resumes stored under static/resumes into content-addressed storage."""
+    click.echo(f'Imported {import_legacy_resumes()} resumes.')
@@ -0,0 +1,174 @@
+from datetime import date, datetime, timedelta
+
+import click
+from sqlalchemy import Date, cast, event, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import Application, Category, DailyMetric, Job
+
+# Events are rolled up as they happen instead of being GROUP BY'd out of
+# the job/application tables on each analytics page load, so the page
+# reads a fixed window of small pre-aggregated rows however long the
+# history gets. Rows count events: deleting a job later does not
+# un-post it.
+JOBS_POSTED = 'jobs_posted'
+APPLICATIONS = 'applications'
+STATUS_PREFIX = 'status:'
+
+NO_CATEGORY = 0
+
+
+def record_counts(connection, rows):
+    """Add each (day, metric, category_id, delta) onto its rollup row."""
+    if not rows:
+        return
+    dialect = connection.dialect.name
+    insert = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}.get(dialect)
+    for day, metric, category_id, delta in rows:
+        key = dict(day=day, metric=metric, category_id=category_id or NO_CATEGORY)
+        if insert is not None:
+            stmt = insert(DailyMetric).values(**key, value=delta)
+            connection.execute(stmt.on_conflict_do_update(
+                index_elements=['day', 'metric', 'category_id'],
+                set_={'value': DailyMetric.value + stmt.excluded.value}
+            ))
+        else:
+            updated = connection.execute(
+                DailyMetric.__table__.update()
+                .filter_by(**key)
+                .values(value=DailyMetric.value + delta)
+            ).rowcount
+            if not updated:
+                connection.execute(DailyMetric.__table__.insert().values(**key, value=delta))
+
+
+def record(connection, events):
+    """Roll up `(day, metric, category_id)` events, one per occurrence.
+
+    Code that writes jobs or applications without going through the ORM
+    session (bulk inserts, UPDATE statements) must call this itself.
+    """
+    totals = {}
+    for event_key in events:
+        totals[event_key] = totals.get(event_key, 0) + 1
+    record_counts(connection, [(*key, delta) for key, delta in totals.items()])
+
+
+def _category_of_jobs(connection, job_ids):
+    if not job_ids:
+        return {}
+    rows = connection.execute(select(Job.id, Job.category_id).where(Job.id.in_(job_ids)))
+    return dict(rows.all())
+
+
+@event.listens_for(Session, 'after_flush')
+def _roll_up_changes(session, flush_context):
+    today = datetime.utcnow().date()
+    new_jobs = [obj for obj in session.new if isinstance(obj, Job)]
+    new_apps = [obj for obj in session.new if isinstance(obj, Application)]
+    status_changes = []
+    for obj in session.dirty:
+        if isinstance(obj, Application):
+            history = inspect(obj).attrs.status.history
+            if history.added and history.deleted and history.added[0] != history.deleted[0]:
+                status_changes.append(obj)
+    if not (new_jobs or new_apps or status_changes):
+        return
+
+    connection = session.connection()
+    categories = _category_of_jobs(
+        connection, {app.job_id for app in new_apps + status_changes}
+    )
+    events = [((job.posted_on or datetime.utcnow()).date(), JOBS_POSTED, job.category_id) for job in new_jobs]
+    events += [((app.applied_on or datetime.utcnow()).date(), APPLICATIONS, categories.get(app.job_id)) for app in new_apps]
+    events += [(today, STATUS_PREFIX + app.status, categories.get(app.job_id)) for app in status_changes]
+    record(connection, events)
+
+
+def _day_of(column):
+    if db.engine.dialect.name == 'sqlite':
+        return func.date(column)
+    return cast(column, Date)
+
+
+def rebuild(since=None):
+    """Recompute job and application rollups from the base tables.
+
+    Only days on or after `since` are rebuilt (everything when None).
+    Status-change rollups cannot be rebuilt, since past statuses are not
+    stored, and are left untouched.
+    """
+    sources = {
+        JOBS_POSTED: (Job.posted_on, Job.category_id, db.session.query(Job)),
+        APPLICATIONS: (Application.applied_on, Job.category_id,
+                       db.session.query(Application).join(Job, Application.job_id == Job.id)),
+    }
+    delete = DailyMetric.query.filter(DailyMetric.metric.in_(list(sources)))
+    if since is not None:
+        delete = delete.filter(DailyMetric.day >= since)
+    delete.delete(synchronize_session=False)
+
+    for metric, (timestamp, category, query) in sources.items():
+        day = _day_of(timestamp)
+        if since is not None:
+            query = query.filter(timestamp >= datetime.combine(since, datetime.min.time()))
+        rows = (
+            query.with_entities(day, func.coalesce(category, NO_CATEGORY), func.count())
+            .group_by(day, func.coalesce(category, NO_CATEGORY))
+            .all()
+        )
+        db.session.add_all(
+            DailyMetric(
+                day=d if isinstance(d, date) else date.fromisoformat(d),
+                metric=metric, category_id=c, value=n
+            )
+            for d, c, n in rows
+        )
+    db.session.commit()
+
+
+def chart_data(days=30):
+    """Series for the analytics charts over the last `days` days."""
+    end = datetime.utcnow().date()
+    start = end - timedelta(days=days - 1)
+    rows = (
+        db.session.query(DailyMetric.day, DailyMetric.metric, DailyMetric.category_id, DailyMetric.value)
+        .filter(DailyMetric.day >= start, DailyMetric.day <= end)
+        .all()
+    )
+
+    labels = [start + timedelta(days=i) for i in range(days)]
+    index = {d: i for i, d in enumerate(labels)}
+    daily = {JOBS_POSTED: [0] * days, APPLICATIONS: [0] * days}
+    by_category, by_status = {}, {}
+    for day, metric, category_id, value in rows:
+        if metric in daily:
+            daily[metric][index[day]] += value
+            totals = by_category.setdefault(category_id, {JOBS_POSTED: 0, APPLICATIONS: 0})
+            totals[metric] += value
+        elif metric.startswith(STATUS_PREFIX):
+            status = metric[len(STATUS_PREFIX):]
+            by_status[status] = by_status.get(status, 0) + value
+
+    names = dict(db.session.query(Category.id, Category.name).filter(Category.id.in_(list(by_category))).all())
+    return {
+        'days': [d.isoformat() for d in labels],
+        'jobs_posted': daily[JOBS_POSTED],
+        'applications': daily[APPLICATIONS],
+        'by_category': [
+            {'category': names.get(cid, 'Uncategorized'), **totals}
+            for cid, totals in sorted(by_category.items(), key=lambda item: -item[1][APPLICATIONS])
+        ],
+        'status_changes': by_status,
+    }
+
+
+@click.command('rebuild-rollups')
+@click.option('--since', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Only rebuild days on or after this date (YYYY-MM-DD).')
+def rebuild_rollups_command(since):
+    """Recompute the daily analytics rollups from the job and application tables."""
+    rebuild(since.date() if since else None)
+    click.echo('Analytics rollups rebuilt.')
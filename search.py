@@ -0,0 +1,162 @@
+import re
+
+import click
+from sqlalchemy import Float, Integer, or_, text
+
+from extensions import db
+from models import Job
+
+# Full-text index over the searchable job columns. It is an external-content
+# FTS5 table, so the text itself lives only in `job`; triggers on `job` keep
+# the index in sync with every insert, update and delete, whichever code
+# path (admin forms, bulk imports, shell) makes the change.
+FTS_TABLE = 'job_fts'
+FTS_COLUMNS = ('title', 'company', 'location', 'tags', 'description')
+
+# bm25() weights, in FTS_COLUMNS order: a hit in the title matters far more
+# than the same word buried in the description.
+BM25_WEIGHTS = (10.0, 5.0, 2.0, 4.0, 1.0)
+
+# Default listing order when there is no relevance score to sort by.
+DEFAULT_SORT_KEYS = (Job.posted_on, Job.id)
+
+# Multi-valued exact-match filters, by query-string name.
+FILTER_COLUMNS = {
+    'job_type': Job.job_type,
+    'experience_level': Job.experience_level,
+    'location': Job.location,
+    'category_id': Job.category_id,
+}
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# (engine, table) -> bool, so we only probe sqlite_master once per process.
+_fts_enabled = {}
+
+
+def _index_ddl():
+    cols = ', '.join(FTS_COLUMNS)
+    new_vals = ', '.join(f'new.{c}' for c in FTS_COLUMNS)
+    old_vals = ', '.join(f'old.{c}' for c in FTS_COLUMNS)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"{cols}, content='job', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON job BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, {cols}) VALUES (new.id, {new_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON job BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON job BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); "
+        f"INSERT INTO {FTS_TABLE}(rowid, {cols}) VALUES (new.id, {new_vals}); END",
+    ]
+
+
+def fts_enabled(table=FTS_TABLE):
+    """True when the FTS5 index `table` exists on the current database."""
+    key = (db.engine, table)
+    if key not in _fts_enabled:
+        enabled = False
+        if db.engine.dialect.name == 'sqlite':
+            with db.engine.connect() as conn:
+                enabled = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                    {'name': table}
+                ).first() is not None
+        _fts_enabled[key] = enabled
+    return _fts_enabled[key]
+
+
+def build_match_expression(query):
+    """Turn free text into an FTS5 MATCH string.
+
+    Every word must match (implicit AND) and is treated as a prefix, so
+    "pyth dev" finds "Python Developer". Quoting each token keeps user
+    input from being parsed as FTS5 operators.
+    """
+    tokens = _TOKEN_RE.findall(query.lower())
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def search_jobs(jobs_query, query):
+    """Restrict `jobs_query` to jobs matching `query`.
+
+    Returns `(query, sort_keys)`; the keys order results best match first
+    when passed to `pagination.paginate`. Uses the BM25-ranked FTS5 index
+    when available and falls back to an ILIKE scan, newest first, on
+    databases without it (e.g. PostgreSQL, or SQLite before the migration
+    has run). Either way every word of `query` must match.
+    """
+    if not fts_enabled():
+        columns = (Job.title, Job.company, Job.tags, Job.description, Job.location)
+        for token in _TOKEN_RE.findall(query):
+            pattern = f'%{token}%'
+            jobs_query = jobs_query.filter(or_(*[column.ilike(pattern) for column in columns]))
+        return jobs_query, DEFAULT_SORT_KEYS
+
+    match = build_match_expression(query)
+    if not match:
+        return jobs_query, DEFAULT_SORT_KEYS
+
+    # bm25() is lower-is-better; negate it so every listing sorts descending.
+    weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+    hits = (
+        text(
+            f"SELECT rowid AS job_id, -bm25({FTS_TABLE}, {weights}) AS score "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+        )
+        .bindparams(match=match)
+        .columns(job_id=Integer, score=Float)
+        .subquery('job_hits')
+    )
+    return jobs_query.join(hits, Job.id == hits.c.job_id), (hits.c.score, Job.id)
+
+
+def parse_job_filters(args):
+    """Read the job filters from a request's query string.
+
+    `experience` is accepted as an alias of `experience_level`, which is
+    what the JSON feed has always been called with.
+    """
+    return {
+        'job_type': args.getlist('job_type'),
+        'experience_level': args.getlist('experience_level') or args.getlist('experience'),
+        'location': args.getlist('location'),
+        'category_id': args.getlist('category_id', type=int),
+        'min_salary': args.get('min_salary', type=int),
+    }
+
+
+def filter_conditions(filters):
+    """Map each active filter name to its SQL condition."""
+    conditions = {}
+    for name, column in FILTER_COLUMNS.items():
+        values = [v for v in filters.get(name) or [] if v not in ('', None)]
+        if values:
+            conditions[name] = column.in_(values)
+    if filters.get('min_salary') is not None:
+        conditions['min_salary'] = Job.min_salary >= filters['min_salary']
+    return conditions
+
+
+def apply_job_filters(jobs_query, filters):
+    return jobs_query.filter(*filter_conditions(filters).values())
+
+
+def rebuild_index():
+    """Create the index and triggers if missing and repopulate from `job`."""
+    with db.engine.begin() as conn:
+        for statement in _index_ddl():
+            conn.execute(text(statement))
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    _fts_enabled.pop((db.engine, FTS_TABLE), None)
+
+
+@click.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Rebuild the job full-text search index."""
+    if db.engine.dialect.name != 'sqlite':
+        click.echo('Full-text index is only used on SQLite; nothing to do.')
+        return
+    rebuild_index()
+    click.echo('Job search index rebuilt.')
@@ -1,67 +1,74 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, session, send_from_directory, current_app, send_file
 import os
 from werkzeug.utils import secure_filename
-from models import Student, Job, Application, Category
+from models import Student, Job, Application
 from extensions import db
 from flask_login import login_required, current_user
 from sqlalchemy import or_,func,and_
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, undefer
+from sqlalchemy.exc import IntegrityError
 from flask import jsonify
+from search import search_jobs, parse_job_filters, apply_job_filters, DEFAULT_SORT_KEYS
+from job_feed import render_feed
+from facets import job_facets
+from recommendations import recommended_jobs
+from job_similarity import similar_jobs
+from resume_storage import store_resume, send_resume, InvalidResume
+from resume_search import queue_extraction
+from werkzeug.exceptions import RequestEntityTooLarge
+from pagination import paginate
+from counters import get_jobs_version
+from http_cache import VersionedResponseCache, conditional_json
 
 student_bp = Blueprint('student', __name__)
 
+# Serialized filter_jobs_json responses, valid until the next job change
+job_feed_cache = VersionedResponseCache(maxsize=512)
+
 @student_bp.route('/dashboard', methods=['GET'])
 @login_required
 def student_dashboard():
-    from models import Job, Application, Category
-    from sqlalchemy import or_
+    from models import Job, Application
 
     # Get filter/search parameters
     query = request.args.get('q', '').strip()
-    min_salary = request.args.get('min_salary', type=int)
-    category_id = request.args.get('category_id', type=int)
+    filters = parse_job_filters(request.args)
 
-    jobs = Job.query
+    jobs = apply_job_filters(Job.query, filters)
+    sort_keys = DEFAULT_SORT_KEYS
 
     if query:
-        jobs = jobs.filter(
-            or_(
-                Job.title.ilike(f"%{query}%"),
-                Job.company.ilike(f"%{query}%"),
-                Job.tags.ilike(f"%{query}%"),
-                Job.description.ilike(f"%{query}%"),
-                Job.location.ilike(f"%{query}%")
-            )
-        )
-
-    if min_salary:
-        jobs = jobs.filter(Job.min_salary >= min_salary)
+        jobs, sort_keys = search_jobs(jobs, query)
 
-    if category_id:
-        jobs = jobs.filter(Job.category_id == category_id)
+    page = paginate(jobs, sort_keys)
 
-    jobs = jobs.all()
-
-    # ✅ Make sure Application.student_id and current_user.id match types
+    # Application.student_id refers to the Student profile, not the User
     applied_job_ids = [
-        app.job_id
-        for app in Application.query
+        job_id
+        for (job_id,) in Application.query
             .with_entities(Application.job_id)
-            .filter(Application.student_id == int(current_user.id))
+            .filter(Application.student_id == session.get('student_id'))
             .all()
     ]
-    applied_job_ids = [job_id for (job_id,) in applied_job_ids]  # unpack tuples
 
-    categories = Category.query.all()
+    # Precomputed; only shown above the first page of results
+    recommended = []
+    if page.is_first:
+        recommended = recommended_jobs(session.get('student_id'), current_app.config['RECOMMENDATIONS_SHOWN'])
 
     return render_template(
         'student/dashboard.html',
-        jobs=jobs,
-        categories=categories,
+        jobs=page.items,
+        page=page,
         query=query,
-        min_salary=min_salary,
-        category_id=category_id,
-        applied_job_ids=applied_job_ids
+        min_salary=filters['min_salary'],
+        category_id=filters['category_id'][0] if filters['category_id'] else None,
+        job_types=filters['job_type'],
+        experience_levels=filters['experience_level'],
+        locations=filters['location'],
+        facets=job_facets(query, filters),
+        applied_job_ids=applied_job_ids,
+        recommended=recommended
     )
 
 @student_bp.route('/jobs')
@@ -72,8 +79,8 @@ def view_jobs():
     if not student_id:
         return redirect(url_for('auth.login'))
 
-    # Get all jobs
-    jobs = Job.query.order_by(Job.posted_on.desc()).all()
+    # Newest jobs first, one page at a time
+    page = paginate(Job.query, DEFAULT_SORT_KEYS)
 
     # Get list of job_ids the student already applied for
     applied_job_ids = db.session.query(Application.job_id).filter_by(student_id=student_id).all()
@@ -81,7 +88,7 @@ def view_jobs():
     # Flatten & ensure integers
     applied_job_ids = [int(job_id) for (job_id,) in applied_job_ids]
 
-    return render_template('student/jobs.html', jobs=jobs, applied_job_ids=applied_job_ids)
+    return render_template('student/jobs.html', jobs=page.items, page=page, applied_job_ids=applied_job_ids)
 
 @student_bp.route('/apply/<int:job_id>', methods=['POST'])
 @login_required
@@ -98,7 +105,13 @@ def apply_job(job_id):
 
     application = Application(student_id=student_id, job_id=job_id)
     db.session.add(application)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent request got there first (unique student/job index)
+        db.session.rollback()
+        flash('You have already applied for this job.', 'warning')
+        return redirect(url_for('student.view_jobs',job_id=job_id))
     flash('Application submitted successfully!', 'success')
     return redirect(url_for('student.view_applications'))
 
@@ -109,7 +122,12 @@ def view_applications():
 
     student_id = session['student_id']
     student = Student.query.get_or_404(student_id)
-    applications = student.applied_jobs
+    applications = (
+        Application.query
+        .filter_by(student_id=student.id)
+        .options(joinedload(Application.job))
+        .all()
+    )
 
     return render_template('student/my_applications.html', applications=applications)
 
@@ -122,14 +140,25 @@ def upload_resume():
     student = Student.query.get_or_404(session['student_id'])
 
     if request.method == 'POST':
-        file = request.files['resume']
-        if file and file.filename.endswith('.pdf'):
-            filepath = os.path.join('static/resumes', secure_filename(file.filename))
-            file.save(filepath)
-            student.resume = filepath
-            db.session.commit()
-            flash('Resume uploaded successfully!', 'success')
-            return redirect(url_for('student.student_dashboard'))
+        # Resumes get a tighter request size limit than the app default
+        request.max_content_length = current_app.config['RESUME_MAX_CONTENT_LENGTH']
+        try:
+            file = request.files.get('resume')
+        except RequestEntityTooLarge:
+            limit_mb = current_app.config['RESUME_MAX_CONTENT_LENGTH'] // (1024 * 1024)
+            flash(f'Resume is too large (maximum {limit_mb} MB).', 'danger')
+            return redirect(url_for('student.upload_resume'))
+
+        if file and file.filename.lower().endswith('.pdf'):
+            file.filename = secure_filename(file.filename)
+            try:
+                sha256 = store_resume(student, file)
+            except InvalidResume as exc:
+                flash(str(exc), 'danger')
+            else:
+                queue_extraction(sha256)
+                flash('Resume uploaded successfully!', 'success')
+                return redirect(url_for('student.student_dashboard'))
         else:
             flash('Please upload a PDF file.', 'danger')
 
@@ -170,15 +199,12 @@ def view_resume():
         flash("No resume uploaded.", "warning")
         return redirect(url_for('student.student_dashboard'))
 
-    resume_folder = os.path.join(current_app.root_path, 'static', 'resumes')
-    resume_filename = os.path.basename(student.resume)
-    resume_path = os.path.join(resume_folder, resume_filename)
-
-    if not os.path.exists(resume_path):
+    response = send_resume(student, as_attachment=False)
+    if response is None:
         flash("Resume file not found on server.", "danger")
         return redirect(url_for('student.student_dashboard'))
 
-    return send_from_directory(directory=resume_folder, path=resume_filename, as_attachment=False)
+    return response
 
 
 
@@ -187,7 +213,12 @@ def view_applications_by_status(status):
     if 'student_id' not in session:
         return redirect(url_for('auth.login'))
 
-    apps = Application.query.filter_by(student_id=session['student_id'], status=status).all()
+    apps = (
+        Application.query
+        .filter_by(student_id=session['student_id'], status=status)
+        .options(joinedload(Application.job))
+        .all()
+    )
     return render_template('student/my_applications.html', applications=apps, filter_status=status)
 
 @student_bp.route('/job/<int:job_id>')
@@ -198,57 +229,18 @@ def job_details(job_id):
     if not student_id:
         return redirect(url_for('auth.login'))
 
-    job = Job.query.get_or_404(job_id)
+    job = Job.query.options(undefer(Job.description)).get_or_404(job_id)
 
     # Check if this student already applied
     applied = Application.query.filter_by(student_id=student_id, job_id=job_id).first() is not None
 
-    return render_template('student/job_details.html', job=job, applied=applied)
+    return render_template('student/job_details.html', job=job, applied=applied,
+                           similar=similar_jobs(job.id))
 
 
 
 @student_bp.route('/jobs/filter-json')
+@conditional_json(get_jobs_version, job_feed_cache, compress=True)
 def filter_jobs_json():
-    query = request.args.get('q', '').strip()
-    job_types = request.args.getlist('job_type')
-    experience_levels = request.args.getlist('experience')
-    locations = request.args.getlist('location')
-    min_salary = request.args.get('min_salary', type=int)
-
-    jobs_query = Job.query.order_by(Job.posted_on.desc())
-
-    if query:
-        jobs_query = jobs_query.filter(db.or_(
-            Job.title.ilike(f'%{query}%'),
-            Job.company.ilike(f'%{query}%'),
-            Job.description.ilike(f'%{query}%'),
-            Job.tags.ilike(f'%{query}%')
-        ))
-
-    if job_types:
-        jobs_query = jobs_query.filter(Job.job_type.in_(job_types))
-
-    if experience_levels:
-        jobs_query = jobs_query.filter(Job.experience_level.in_(experience_levels))
-
-    if locations:
-        jobs_query = jobs_query.filter(Job.location.in_(locations))
-
-    if min_salary is not None:
-        jobs_query = jobs_query.filter(Job.min_salary >= min_salary)
-
-    jobs = jobs_query.all()
-
-    return jsonify([
-        {
-            "id": job.id,
-            "title": job.title,
-            "company": job.company,
-            "location": job.location,
-            "type": job.job_type,
-            "experience": job.experience_level,
-            "salary": job.min_salary,
-            "posted_on": job.posted_on.strftime('%Y-%m-%d')
-        }
-        for job in jobs
-    ])
+    # Column-projected rows straight to JSON, see job_feed.py
+    return current_app.response_class(render_feed(request.args), mimetype='application/json')
@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# Config reads the environment when it is imported, so point the app at a
+# scratch database and folders before anything imports it.
+_scratch = tempfile.mkdtemp(prefix='bl-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_scratch, 'test.db')
+os.environ['RESUME_FOLDER'] = os.path.join(_scratch, 'resumes')
+os.environ['EXPORT_FOLDER'] = os.path.join(_scratch, 'exports')
+os.environ['PROFILE_FOLDER'] = os.path.join(_scratch, 'profiles')
+
+
+@pytest.fixture(scope='session')
+def app():
+    """The app on a fresh SQLite file, built by the migrations."""
+    from flask_migrate import upgrade
+
+    from app import app as flask_app
+
+    flask_app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    with flask_app.app_context():
+        upgrade()
+    yield flask_app
+    shutil.rmtree(_scratch, ignore_errors=True)
+
+
+@pytest.fixture(scope='module')
+def empty_db(app):
+    """The app with every table emptied, for tests that count rows."""
+    import counters
+    from extensions import db
+    from models import SiteCounter, User
+
+    # the admin stays, so the admin client stays signed in; the counter
+    # rows seeded by the migrations stay, recounted
+    kept = {User.__tablename__, SiteCounter.__tablename__}
+    with app.app_context():
+        for table in reversed(db.metadata.sorted_tables):
+            if table.name not in kept:
+                db.session.execute(table.delete())
+        db.session.execute(User.__table__.delete().where(User.role != 'admin'))
+        db.session.commit()
+        counters.reconcile()
+    return app
+
+
+@pytest.fixture(scope='session')
+def admin_client(app):
+    client = app.test_client()
+    response = client.post('/auth/login', data={
+        'email': app.config['ADMIN_EMAIL'],
+        'password': app.config['ADMIN_PASSWORD'],
+    })
+    assert response.status_code == 302
+    return client
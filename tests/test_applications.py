@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import func
+
+from applications import bulk_update_status
+from extensions import db
+from models import Application, Category, DailyMetric, Job, Student, User
+from rollups import STATUS_PREFIX
+
+
+def test_bulk_update_rolls_up_the_rows_it_changed(empty_db):
+    with empty_db.app_context():
+        category = Category(name='Bulk')
+        job = Job(title='Bulk job', company='Acme', location='Remote', description='Bulk.', category=category)
+        students = [Student(name=f'Bulk {i}', user=User(email=f'bulk{i}@example.com', password='x'))
+                    for i in range(3)]
+        db.session.add_all([job, *students])
+        db.session.flush()
+        # the first is already Selected: neither updated nor rolled up again
+        db.session.add_all(Application(student_id=student.id, job_id=job.id,
+                                       status='Selected' if i == 0 else 'pending')
+                           for i, student in enumerate(students))
+        db.session.commit()
+
+        updated = bulk_update_status('Selected', job_id=job.id)
+
+        assert updated == 2
+        assert db.session.query(func.count()).filter(Application.status == 'Selected').scalar() == 3
+        rolled_up = (
+            db.session.query(func.sum(DailyMetric.value))
+            .filter_by(metric=STATUS_PREFIX + 'Selected', category_id=category.id)
+            .scalar()
+        )
+        assert rolled_up == 2
+
+
+@pytest.mark.parametrize('payload', [
+    {'status': 'Selected', 'application_ids': '12'},
+    {'status': 'Selected', 'application_ids': [1, 'x']},
+    {'status': 'Selected', 'application_ids': [None]},
+    {'status': 'Selected', 'application_ids': [True]},
+    {'status': 'Selected', 'job_id': '3'},
+    {'status': 'Selected', 'job_id': 1, 'from_status': ['pending']},
+    {'status': 'Unknown', 'job_id': 1},
+    ['Selected'],
+])
+def test_bulk_update_rejects_malformed_json(admin_client, payload):
+    response = admin_client.post('/admin/applications/bulk-update', json=payload)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
@@ -0,0 +1,21 @@
+from datetime import datetime, timedelta
+
+from exports import find_fresh_export
+from extensions import db
+from models import ExportJob
+
+
+def test_stale_running_export_is_failed_not_reused(app):
+    timeout = app.config['EXPORT_TIMEOUT_SECONDS']
+    with app.app_context():
+        stale = ExportJob(job_id=None, file_format='csv', status='running', filename='stale.csv',
+                          created_on=datetime.utcnow() - timedelta(seconds=timeout + 60))
+        running = ExportJob(job_id=None, file_format='xlsx', status='running', filename='running.xlsx',
+                            created_on=datetime.utcnow() - timedelta(seconds=timeout - 60))
+        db.session.add_all([stale, running])
+        db.session.commit()
+
+        assert find_fresh_export(None, 'csv') is None
+        assert db.session.get(ExportJob, stale.id).status == 'failed'
+        # still within the timeout, though older than EXPORT_FRESHNESS_SECONDS
+        assert find_fresh_export(None, 'xlsx').id == running.id
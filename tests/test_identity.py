@@ -0,0 +1,57 @@
+import io
+
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models import ResumeFile, Student, User
+from resume_storage import store_resume
+
+PDF = b'%PDF-1.4\n1 0 obj << >> endobj\ntrailer << >>\n%%EOF\n'
+
+
+class _Upload:
+    def __init__(self, data, filename='resume.pdf'):
+        self.stream = io.BytesIO(data)
+        self.filename = filename
+
+
+def _sign_in(app, email):
+    client = app.test_client()
+    response = client.post('/auth/login', data={'email': email, 'password': 'secret'})
+    assert response.status_code == 302
+    return client
+
+
+def test_upload_after_a_change_behind_the_cache_updates_the_right_references(empty_db):
+    app = empty_db
+    with app.app_context():
+        password = generate_password_hash('secret', method='pbkdf2:sha256:1')
+        first = Student(name='cached', user=User(email='cached@example.com', password=password))
+        second = Student(name='sharer', user=User(email='sharer@example.com', password=password))
+        db.session.add_all([first, second])
+        db.session.commit()
+        shared = store_resume(first, _Upload(PDF + b'% shared\n'))
+        store_resume(second, _Upload(PDF + b'% shared\n'))
+        first_id = first.id
+
+    client = _sign_in(app, 'cached@example.com')
+    assert client.get('/student/resume/upload').status_code == 200  # caches the identity
+
+    # another worker replaces the resume; Core statements skip this
+    # process's cache eviction, so the cached Student still says `shared`
+    other = 'b' * 64
+    with app.app_context():
+        db.session.execute(ResumeFile.__table__.insert().values(sha256=other, size=1, ref_count=1))
+        db.session.execute(ResumeFile.__table__.update().where(ResumeFile.sha256 == shared)
+                           .values(ref_count=ResumeFile.ref_count - 1))
+        db.session.execute(Student.__table__.update().where(Student.id == first_id)
+                           .values(resume_sha256=other))
+        db.session.commit()
+
+    response = client.post('/student/resume/upload', data={'resume': (io.BytesIO(PDF + b'% new\n'), 'new.pdf')})
+    assert response.status_code == 302
+
+    with app.app_context():
+        # the other student's reference survives; the replaced upload's is released
+        assert db.session.get(ResumeFile, shared).ref_count == 1
+        assert db.session.get(ResumeFile, other) is None
@@ -0,0 +1,50 @@
+import numpy as np
+from sqlalchemy import insert
+
+import counters
+from extensions import db
+from matching import MatchIndex
+from models import Job
+
+
+def _job(title, description):
+    return Job(title=title, company='Acme', location='Remote', description=description)
+
+
+def test_job_refresh_fetches_only_changed_rows(empty_db):
+    with empty_db.app_context():
+        kept, edited, deleted = _job('Kept', 'Python APIs.'), _job('Edited', 'Go services.'), _job('Deleted', 'Rust CLIs.')
+        db.session.add_all([kept, edited, deleted])
+        db.session.commit()
+        index = MatchIndex()
+        index.job_vectors()
+
+        edited.description = 'Kotlin apps.'
+        db.session.delete(deleted)
+        db.session.commit()
+        # as job_import does; SQLite hands the deleted job's id out again
+        version = counters.bump_jobs_version(db.session.connection())
+        db.session.execute(insert(Job), [{'title': 'Bulk', 'company': 'Acme', 'location': 'Remote',
+                                          'description': 'Elixir jobs.', 'changed_version': version}])
+        db.session.commit()
+        bulk_id = db.session.query(Job.id).filter_by(title='Bulk').scalar()
+
+        fetched = []
+        changed_job_rows = index._changed_job_rows
+
+        def recording_changed_job_rows():
+            rows = changed_job_rows()
+            fetched.extend(row.id for row in rows)
+            return rows
+
+        index._changed_job_rows = recording_changed_job_rows
+        ids, vectors, idf = index.job_vectors()
+        assert sorted(fetched) == sorted([edited.id, bulk_id])
+
+        # the same vectors and IDF as a full load
+        full_ids, full_vectors, full_idf = MatchIndex().job_vectors()
+        assert sorted(ids) == sorted(full_ids) == sorted([kept.id, edited.id, bulk_id])
+        full = dict(zip(full_ids, full_vectors))
+        for job_id, (indices, counts) in zip(ids, vectors):
+            assert np.array_equal(indices, full[job_id][0]) and np.array_equal(counts, full[job_id][1])
+        assert np.allclose(idf, full_idf)
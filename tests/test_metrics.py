@@ -0,0 +1,9 @@
+import metrics
+import profiling
+
+
+def test_metrics_clock_starts_before_the_other_request_hooks(app):
+    hooks = app.before_request_funcs[None]
+    assert hooks[0] is metrics._start_request
+    # the profiler's hook comes next, ahead of the app's own
+    assert hooks[1].__module__ == profiling.__name__
@@ -0,0 +1,107 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+
+import identity
+from extensions import db
+from matching import match_index
+from models import Application, Job, Student, User
+
+# Pages that list applications must run the same number of queries
+# whatever the number of rows, or an N+1 lazy load has crept back in.
+ROUTES = [
+    '/admin/applicants/{job_id}',
+    '/admin/applications',
+    '/admin/students/{student_id}',
+    '/admin/applicants/download/{job_id}',
+    '/admin/applicants/download/{job_id}?format=csv',
+    '/admin/applicants/download/all',
+    '/admin/applicants/download/all?format=csv',
+]
+
+# Generous, but far below one query per row of the larger dataset
+MAX_QUERIES = 8
+
+
+def _add_rows(jobs, students):
+    """Add jobs and students; every student applies to every job."""
+    first_user = db.session.query(db.func.count(User.id)).scalar()
+    new_jobs = [
+        Job(title=f'Job {i}', company='Acme', location='Remote', description='Build things.')
+        for i in range(jobs)
+    ]
+    new_students = [
+        Student(name=f'Student {i}', user=User(email=f'student{first_user + i}@example.com',
+                                               password=generate_password_hash('x', method='pbkdf2:sha256:1')))
+        for i in range(students)
+    ]
+    db.session.add_all(new_jobs + new_students)
+    db.session.flush()
+    applied = set(db.session.query(Application.student_id, Application.job_id))
+    every_student = Student.query.all()
+    # job by job, so any page of applications spans many students
+    for job in Job.query.all():
+        db.session.add_all(Application(student_id=student.id, job_id=job.id)
+                           for student in every_student if (student.id, job.id) not in applied)
+    db.session.commit()
+
+
+@contextmanager
+def _count_queries(app):
+    counter = {'queries': 0}
+
+    def count(*args):
+        counter['queries'] += 1
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+
+
+def _query_counts(app, client):
+    with app.app_context():
+        job_id = db.session.query(db.func.min(Job.id)).scalar()
+        student_id = db.session.query(db.func.min(Student.id)).scalar()
+        identity_cache = identity._get_cache()
+        match_index.job_vectors()  # caught up with the jobs just added, whatever it costs
+    # requests are sent outside any app context: under one, they would all
+    # share its session, and lazy loads would be answered from its
+    # identity map without a query
+    counts = {}
+    for route in ROUTES:
+        url = route.format(job_id=job_id, student_id=student_id)
+        identity_cache.clear()  # the user loader queries on every request
+        with _count_queries(app) as counter:
+            response = client.get(url)
+            response.get_data()  # streamed exports query while streaming
+        assert response.status_code == 200, url
+        counts[route] = counter['queries']
+    return counts
+
+
+@pytest.fixture(scope='module')
+def query_counts(empty_db, app, admin_client):
+    with app.app_context():
+        _add_rows(jobs=2, students=2)
+    small = _query_counts(app, admin_client)
+    with app.app_context():
+        _add_rows(jobs=8, students=28)
+    large = _query_counts(app, admin_client)
+    return small, large
+
+
+def test_query_count_does_not_grow_with_rows(query_counts):
+    small, large = query_counts
+    assert large == small
+
+
+@pytest.mark.parametrize('route', ROUTES)
+def test_query_count_is_bounded(query_counts, route):
+    small, large = query_counts
+    assert large[route] <= MAX_QUERIES
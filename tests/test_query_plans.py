@@ -0,0 +1,9 @@
+from query_plans import HOT_QUERIES, full_scans
+
+
+def test_hot_queries_use_indexes(app):
+    # the schema comes from the migrations (see conftest), not create_all,
+    # so a missing index migration fails here
+    with app.app_context():
+        assert HOT_QUERIES
+        assert full_scans() == {}
@@ -0,0 +1,43 @@
+import recommendations
+from extensions import db
+from models import Job, JobRecommendation, Student, User
+
+
+def _job(title, description):
+    job = Job(title=title, company='Acme', location='Remote', description=description)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def _student(name, experience):
+    student = Student(name=name, experience=experience, user=User(email=f'{name}@example.com', password='x'))
+    db.session.add(student)
+    db.session.commit()
+    return student
+
+
+def test_student_without_matches_is_not_rescored_against_every_job(empty_db, monkeypatch):
+    with empty_db.app_context():
+        _job('Python developer', 'Build Flask services in Python.')
+        matched = _student('rec-matched', 'Python and Flask services')
+        unmatched = _student('rec-unmatched', 'Pottery glazing')
+        recommendations.refresh(full=True)
+        assert db.session.query(JobRecommendation).filter_by(student_id=unmatched.id).count() == 0
+
+        new_job = _job('Python engineer', 'Python services at scale.')
+        scored_jobs = []
+        candidates = recommendations._Candidates
+
+        def recording_candidates(job_ids, *args):
+            scored_jobs.append(job_ids)
+            return candidates(job_ids, *args)
+
+        monkeypatch.setattr(recommendations, '_Candidates', recording_candidates)
+        assert recommendations.refresh() == 2
+
+        # only the new job was scored, for both students
+        assert scored_jobs == [[new_job.id]]
+        assert db.session.query(JobRecommendation).filter_by(student_id=matched.id, job_id=new_job.id).count() == 1
+        for student in (matched, unmatched):
+            assert db.session.get(Student, student.id, populate_existing=True).recommendations_job_id == new_job.id
@@ -0,0 +1,34 @@
+from resume_search import extract_pdf_text
+
+
+def _pdf(content):
+    """A one-page PDF showing `content` in Helvetica, with a valid xref."""
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+        b'/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+        b'<< /Length %d >>\nstream\n' % len(content) + content + b'\nendstream',
+    ]
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def test_extracts_literal_and_hex_strings(tmp_path):
+    path = tmp_path / 'resume.pdf'
+    path.write_bytes(_pdf(
+        b'BT /F1 12 Tf 72 720 Td (Python developer) Tj 0 -20 Td '
+        b'[<466c61736b> -300 <53514c>] TJ ET'
+    ))
+    text = extract_pdf_text(str(path))
+    assert 'Python developer' in text
+    assert 'Flask' in text and 'SQL' in text
@@ -0,0 +1,62 @@
+import io
+import os
+
+from extensions import db
+from models import ResumeFile, Student, User
+from resume_storage import path_for_hash, send_resume, store_resume
+
+PDF = b'%PDF-1.4\n1 0 obj << >> endobj\ntrailer << >>\n%%EOF\n'
+
+
+class _Upload:
+    def __init__(self, data, filename='resume.pdf'):
+        self.stream = io.BytesIO(data)
+        self.filename = filename
+
+
+def _student(name):
+    student = Student(name=name, user=User(email=f'{name}@example.com', password='x'))
+    db.session.add(student)
+    db.session.commit()
+    return student
+
+
+def test_same_pdf_is_stored_once_and_counted(empty_db):
+    with empty_db.app_context():
+        first, second = _student('resume-a'), _student('resume-b')
+        sha256 = store_resume(first, _Upload(PDF))
+        assert store_resume(second, _Upload(PDF)) == sha256
+        assert db.session.get(ResumeFile, sha256, populate_existing=True).ref_count == 2
+
+
+def test_missing_resume_file_is_not_served(empty_db):
+    with empty_db.app_context():
+        student = _student('resume-missing')
+        sha256 = store_resume(student, _Upload(PDF + b'% missing\n'))
+        with empty_db.test_request_context():
+            response = send_resume(student)
+            assert response.status_code == 200
+            response.close()
+            os.remove(path_for_hash(sha256))
+            assert send_resume(student) is None
+
+
+def test_upload_restores_a_file_removed_by_a_concurrent_release(empty_db):
+    with empty_db.app_context():
+        first, second = _student('resume-c'), _student('resume-d')
+        sha256 = store_resume(first, _Upload(PDF + b'% shared\n'))
+        # as if another request had just unlinked it after releasing it
+        os.remove(path_for_hash(sha256))
+        store_resume(second, _Upload(PDF + b'% shared\n'))
+        assert os.path.exists(path_for_hash(sha256))
+
+
+def test_replacing_the_last_reference_removes_the_old_file(empty_db):
+    with empty_db.app_context():
+        student = _student('resume-e')
+        old = store_resume(student, _Upload(PDF + b'% old\n'))
+        new = store_resume(student, _Upload(PDF + b'% new\n'))
+        assert db.session.get(ResumeFile, old) is None
+        assert not os.path.exists(path_for_hash(old))
+        assert os.path.exists(path_for_hash(new))
+        assert db.session.get(ResumeFile, new, populate_existing=True).ref_count == 1